@@ -1,4 +1,5 @@
 import argparse
+import multiprocessing
 import traceback
 
 from palworld_pal_editor.utils import LOGGER, DataProvider, check_or_generate_port
@@ -73,6 +74,8 @@ def main():
             webui_main()
 
 if __name__ == "__main__":
+    # SaveManager.open decodes player saves on a process pool, which frozen builds need this for
+    multiprocessing.freeze_support()
     LOGGER.info(f"Logs written to {PROGRAM_PATH / 'logs'}")
     
     try:
@@ -94,22 +94,24 @@ def get_player_data():
         LOGGER.warning(f"Player {PlayerUId} not exist")
         return reply(1, None, f"Player {PlayerUId} not exist")
 
+    # Loads the player sav before player_to_dict, so the reply carries its fields
+    unlocked_techs = player_entity.UnlockedRecipeTechnologyNames or []
     player_dict = player_to_dict(player_entity)
-    player_dict["UnlockedRecipeTechnologyNames"] = (
-        player_entity.UnlockedRecipeTechnologyNames or []
-    )
+    player_dict["UnlockedRecipeTechnologyNames"] = unlocked_techs
 
     return reply(0, player_dict)
 
 
 def player_to_dict(player: PlayerEntity):
+    # Listing players shouldn't decode every player sav; the webui fetches /player_data on selection
+    sav_loaded = player.is_player_sav_loaded
     return {
         "InstanceId": str(player.PlayerUId),
         "NickName": player.NickName or "",
         "Level": player.Level or 1,
-        "HasViewingCage": player.has_viewing_cage(),
-        "OtomoCharacterContainerId": str(player.OtomoCharacterContainerId),
-        "PalStorageContainerId": str(player.PalStorageContainerId),
+        "HasViewingCage": player.has_viewing_cage() if sav_loaded else None,
+        "OtomoCharacterContainerId": str(player.OtomoCharacterContainerId) if sav_loaded else None,
+        "PalStorageContainerId": str(player.PalStorageContainerId) if sav_loaded else None,
         "UnlockedRecipeTechnologyNames": [],
     }
 
@@ -14,6 +14,8 @@ class PalContainer:
         self._slots_data: list = PalObjects.get_ArrayProperty(
             self._container_obj["value"]["Slots"]
         )
+        # Changed since Level.sav was read or last saved in place
+        self.is_dirty = False
 
         if self.ID is None or self._slots_data is None:
             raise Exception("Invalid Container")
@@ -69,6 +71,7 @@ class PalContainer:
         slot = ContainerSlot(self._slots_data[slot_idx])
         slot.instance_id = pal_id
         self.slots.append(slot)
+        self.is_dirty = True
 
         LOGGER.info(f"Pal {pal_id} add to container {self.ID} @ {slot.inv_idx} ")
         return slot.inv_idx
@@ -90,6 +93,7 @@ class PalContainer:
         self.slots[slot_idx].clear() # unnecessary since 0.3.3
         self.slots.pop(slot_idx)
         self._del_slot(slot_idx)
+        self.is_dirty = True
         
 
     def get_pal_idx(self, pal_id: UUID | str) -> Optional[int]:
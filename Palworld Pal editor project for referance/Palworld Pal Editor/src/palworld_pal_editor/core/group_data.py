@@ -15,6 +15,8 @@ class PalGroup:
 
         self.instance_map = {}
         self.player_map = {}
+        # Changed since Level.sav was read or last saved in place
+        self.is_dirty = False
 
         for instance in self.individual_character_handle_ids or []:
             self.instance_map[str(instance["instance_id"])] = instance
@@ -44,6 +46,7 @@ class PalGroup:
         # if self.individual_character_handle_ids is None:
         #     self._group_param["individual_character_handle_ids"] = []
         # self.individual_character_handle_ids.append(new_handle)
+        self.is_dirty = True
         return True
 
     def del_pal(self, instanceId: UUID | str):
@@ -56,6 +59,7 @@ class PalGroup:
                 pass
             case _:
                 self.individual_character_handle_ids.remove(handle)
+        self.is_dirty = True
 
     def has_pal(self, instanceId: UUID | str) -> bool:
         return instanceId in self.instance_map
@@ -53,6 +53,8 @@ class PalEntity:
         self.owner_player_entity = None
         self.is_unreferenced_pal = False
         self.is_new_pal = False
+        # Changed since Level.sav was read or last saved in place
+        self.is_dirty = False
 
     def __str__(self) -> str:
         return "{} - {} - {}".format(self.DisplayName, self.OwnerName, self.InstanceId)
@@ -66,6 +68,9 @@ class PalEntity:
     def set_owner_player_entity(self, player):
         self.owner_player_entity = player
 
+    def mark_dirty(self, attr_name: Optional[str] = None):
+        self.is_dirty = True
+
     @property
     def in_owner_palbox(self) -> bool:
         # base pal, no owner
@@ -1,4 +1,8 @@
-from typing import Any, Optional
+from concurrent.futures import CancelledError, Future
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+import time
+from typing import Any, Callable, Optional
 from palworld_save_tools.archive import UUID
 from palworld_save_tools.gvas import GvasFile
 
@@ -9,24 +13,71 @@ from palworld_pal_editor.utils.data_provider import DataProvider
 from palworld_pal_editor.utils.util import clamp, type_guard
 
 
+class LazyPlayerSav:
+    """
+    A Players/<uid>.sav that is only read and decoded the first time its data is needed.
+    With a `prefetch` future (see SaveManager._prefetch_player_savs) the first use
+    takes the save decoded in the background, and only loads it inline if the pool failed.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        loader: Callable[[Path], tuple[GvasFile, int]],
+        prefetch: Optional[Future] = None,
+    ) -> None:
+        self.path = path
+        self._loader = loader
+        self._prefetch = prefetch
+        self._gvas_file: Optional[GvasFile] = None
+        self._compression_times: Optional[int] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._gvas_file is not None
+
+    def load(self) -> tuple[GvasFile, int]:
+        if self._gvas_file is None:
+            prefetch, self._prefetch = self._prefetch, None
+            if prefetch is not None:
+                start = time.perf_counter()
+                try:
+                    self._gvas_file, self._compression_times = prefetch.result()
+                    LOGGER.info(
+                        f"Player SAV {self.path} taken from the prefetch pool, waited {(time.perf_counter() - start) * 1000:.0f} ms"
+                    )
+                except (BrokenProcessPool, CancelledError):
+                    LOGGER.warning(f"Player sav pool failed, loading {self.path} inline")
+        if self._gvas_file is None:
+            LOGGER.info(f"Loading Player SAV: {self.path}")
+            self._gvas_file, self._compression_times = self._loader(self.path)
+        return self._gvas_file, self._compression_times
+
+
 class PlayerEntity:
     MAX_LEVEL = 60
     MAX_INVALID_LEVEL = 100
+    # Attributes kept in Players/<uid>.sav; the rest of the player is in Level.sav
+    PLAYER_SAV_ATTRS = {"UnlockedRecipeTechnologyNames", "TechnologPoint", "bossTechPoint", "RecordData"}
 
     def __init__(
         self,
         group_id: UUID | str,
         player_obj: dict,
         palbox: dict[str, PalEntity],
-        gvas_file: GvasFile,
-        compression_times: int,
+        player_sav: LazyPlayerSav,
     ) -> None:
         self._player_obj: dict = player_obj
         self._palbox: dict[str, PalEntity] = palbox
         self._new_palbox: dict[str, PalEntity] = {}
-        self._gvas_file: GvasFile = gvas_file
-        self._gvas_compression_times: int = compression_times
+        self._player_sav: LazyPlayerSav = player_sav
+        self._save_data: Optional[dict] = None
+        # Why the player sav couldn't be read or didn't match this player, once that has been found out
+        self.player_sav_error: Optional[str] = None
         self.group_id = group_id
+        # Changed since read or last saved in place, in Level.sav and in the player sav
+        self.is_dirty = False
+        self.is_player_sav_dirty = False
 
         if (
             self._player_obj["value"]["RawData"]["value"]["object"]["SaveParameter"][
@@ -52,20 +103,65 @@ class PlayerEntity:
                 )
             )
 
-        self._player_save_data: dict = self._gvas_file.properties["SaveData"]["value"]
+    @property
+    def _player_save_data(self) -> dict:
+        """
+        The player sav's SaveData, decoded the first time anything reads it.
+        If it can't be decoded or belongs to another player, the player is marked
+        unloadable and this is an empty dict, so its fields read as missing.
+        """
+        if self._save_data is None:
+            if self.player_sav_error is not None:
+                return {}
+            try:
+                gvas_file, _ = self._player_sav.load()
+                save_data: dict = gvas_file.properties["SaveData"]["value"]
+
+                IndividualId = save_data.get("IndividualId", {}).get("value", {})
+                sav_playerUId = PalObjects.get_BaseType(IndividualId.get("PlayerUId"))
+                sav_InstanceId = PalObjects.get_BaseType(IndividualId.get("InstanceId"))
+                if self.PlayerUId != sav_playerUId:
+                    raise Exception(
+                        f"PlayerUId unmatch: Level.sav: {self.PlayerUId} v.s. playerid.sav {sav_playerUId}"
+                    )
+                if self.InstanceId != sav_InstanceId:
+                    raise Exception(
+                        f"InstanceId unmatch: Level.sav: {self.InstanceId} v.s. playerid.sav {sav_InstanceId}"
+                    )
+            except Exception as e:
+                self.player_sav_error = str(e)
+                LOGGER.error(f"Player SAV {self.player_sav_path} of {self} is unloadable: {e}")
+                return {}
+            self._save_data = save_data
+        return self._save_data
+
+    def _editable_player_save_data(self) -> dict:
+        save_data = self._player_save_data
+        if self.player_sav_error is not None:
+            raise Exception(f"Player SAV of {self} is unloadable, refusing to edit it: {self.player_sav_error}")
+        return save_data
 
-        IndividualId = self._player_save_data.get("IndividualId", {}).get("value", {})
-        sav_playerUId = PalObjects.get_BaseType(IndividualId.get("PlayerUId"))
-        sav_InstanceId = PalObjects.get_BaseType(IndividualId.get("InstanceId"))
-        if self.PlayerUId != sav_playerUId:
-            raise Exception(
-                f"PlayerUId unmatch: Level.sav: {self.PlayerUId} v.s. playerid.sav {sav_playerUId}"
-            )
-        if self.InstanceId != sav_InstanceId:
-            raise Exception(
-                f"InstanceId unmatch: Level.sav: {self.InstanceId} v.s. playerid.sav {sav_InstanceId}"
-            )
-        
+    @property
+    def is_player_sav_loaded(self) -> bool:
+        return self._save_data is not None
+
+    @property
+    def is_player_sav_unloadable(self) -> bool:
+        """
+        Reads the player sav if nothing has yet.
+        """
+        self._player_save_data
+        return self.player_sav_error is not None
+
+    @property
+    def player_sav_path(self) -> Path:
+        return self._player_sav.path
+
+    def mark_dirty(self, attr_name: Optional[str] = None):
+        if attr_name in PlayerEntity.PLAYER_SAV_ATTRS:
+            self.is_player_sav_dirty = True
+        else:
+            self.is_dirty = True
 
     def __str__(self) -> str:
         return "{} - {} - {}".format(self.NickName, self.PlayerUId, self.InstanceId)
@@ -297,8 +393,9 @@ class PlayerEntity:
 
     @LOGGER.change_logger("UnlockedRecipeTechnologyNames")
     def toggle_UnlockedRecipeTechnologyNames(self, tech: str, status: bool):
+        save_data = self._editable_player_save_data()
         if self.UnlockedRecipeTechnologyNames is None:
-            self._player_save_data["UnlockedRecipeTechnologyNames"] = (
+            save_data["UnlockedRecipeTechnologyNames"] = (
                 PalObjects.ArrayProperty("NameProperty", {"values": []})
             )
         if status:
@@ -322,9 +419,12 @@ class PlayerEntity:
 
     @property
     def PlayerGVAS(self) -> Optional[tuple[GvasFile, int]]:
-        if (self._gvas_file is None) or (self._gvas_compression_times is None):
+        """
+        None until something has read the player sav, i.e. it is unchanged on disk.
+        """
+        if not self.is_player_sav_loaded:
             return None
-        return self._gvas_file, self._gvas_compression_times
+        return self._player_sav.load()
 
     def add_pal(self, pal_entity: PalEntity) -> bool:
         """
@@ -349,10 +449,11 @@ class PlayerEntity:
     @LOGGER.change_logger("TechnologPoint")
     @type_guard
     def TechnologPoint(self, value: int) -> None:
+        save_data = self._editable_player_save_data()
         if self.TechnologPoint is None:
-            self._player_save_data["TechnologPoint"] = PalObjects.IntProperty(value)
+            save_data["TechnologPoint"] = PalObjects.IntProperty(value)
         else:
-            PalObjects.set_BaseType(self._player_save_data["TechnologPoint"], value)
+            PalObjects.set_BaseType(save_data["TechnologPoint"], value)
 
     @property
     def bossTechPoint(self) -> Optional[int]:
@@ -362,15 +463,17 @@ class PlayerEntity:
     @LOGGER.change_logger("bossTechPoint")
     @type_guard
     def bossTechPoint(self, value: int) -> None:
+        save_data = self._editable_player_save_data()
         if self.bossTechPoint is None:
-            self._player_save_data["bossTechPoint"] = PalObjects.IntProperty(value)
+            save_data["bossTechPoint"] = PalObjects.IntProperty(value)
         else:
-            PalObjects.set_BaseType(self._player_save_data["bossTechPoint"], value)
+            PalObjects.set_BaseType(save_data["bossTechPoint"], value)
     
     def try_create_pal_record_data(self):
-        if "RecordData" not in self._player_save_data:
-            self._player_save_data["RecordData"] = PalObjects.PalLoggedinPlayerSaveDataRecordData()
-        record_data = self._player_save_data["RecordData"]["value"]
+        save_data = self._editable_player_save_data()
+        if "RecordData" not in save_data:
+            save_data["RecordData"] = PalObjects.PalLoggedinPlayerSaveDataRecordData()
+        record_data = save_data["RecordData"]["value"]
 
         if "PalCaptureCount" not in record_data:
             record_data["PalCaptureCount"] = PalObjects.MapProperty("NameProperty", "IntProperty")
@@ -400,6 +503,7 @@ class PlayerEntity:
         
     def inc_pal_capture_count(self, name: str):
         self.try_create_pal_record_data()
+        self.mark_dirty("RecordData")
         for record in self.PalCaptureCount:
             if record['key'].lower() == name.lower():
                 record['value'] += 1
@@ -412,6 +516,7 @@ class PlayerEntity:
 
     def unlock_paldeck(self, name: str):
         self.try_create_pal_record_data()
+        self.mark_dirty("RecordData")
         for record in self.PaldeckUnlockFlag:
             if record['key'].lower() == name.lower():
                 record['value'] = True
@@ -425,6 +530,10 @@ class PlayerEntity:
         """
         This should only be called on save
         """
+        if self._new_palbox and self.is_player_sav_unloadable:
+            LOGGER.warning(f"Player SAV of {self} is unloadable, skipping records of its new pals")
+            return
+
         def handle_special_keys(key) -> str:
             match key:
                 case 'PlantSlime_Flower': return 'PlantSlime'
@@ -1,9 +1,15 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 import copy
 from datetime import datetime
+import os
 from pathlib import Path
+import re
 import shutil
+import time
 import traceback
-from typing import Optional
+from typing import Callable, Optional
 import uuid
 
 from palworld_save_tools.gvas import GvasFile
@@ -16,7 +22,7 @@ from palworld_pal_editor.core.basecamp_data import BaseCampData
 from palworld_pal_editor.core.container_data import ContainerData
 
 from palworld_pal_editor.core.pal_objects import PalObjects, UUID2HexStr, toUUID
-from palworld_pal_editor.core.player_entity import PlayerEntity
+from palworld_pal_editor.core.player_entity import LazyPlayerSav, PlayerEntity
 from palworld_pal_editor.core.pal_entity import PalEntity
 from palworld_pal_editor.utils import LOGGER, alphanumeric_key
 from palworld_pal_editor.core.group_data import GroupData
@@ -58,32 +64,30 @@ def skip_decode(reader: FArchiveReader, type_name: str, size: int, path: str):
 
 
 def skip_encode(writer: FArchiveWriter, property_type: str, properties: dict) -> int:
+    """
+    Writes a property skip_decode kept as raw bytes, leaving `properties` as it was.
+    """
     if "skip_type" not in properties:
-        if properties["custom_type"] in PALWORLD_CUSTOM_PROPERTIES is not None:
-            return PALWORLD_CUSTOM_PROPERTIES[properties["custom_type"]][1](
+        if properties["custom_type"] in SAVE_CUSTOM_PROPERTIES:
+            return SAVE_CUSTOM_PROPERTIES[properties["custom_type"]][1](
                 writer, property_type, properties
             )
         else:
             # Never be run to here
-            return writer.property_inner(writer, property_type, properties)
+            plain = {key: value for key, value in properties.items() if key != "custom_type"}
+            return writer.property_inner(property_type, plain)
     if property_type == "ArrayProperty":
-        del properties["custom_type"]
-        del properties["skip_type"]
         writer.fstring(properties["array_type"])
         writer.optional_guid(properties.get("id", None))
         writer.write(properties["value"])
         return len(properties["value"])
     elif property_type == "MapProperty":
-        del properties["custom_type"]
-        del properties["skip_type"]
         writer.fstring(properties["key_type"])
         writer.fstring(properties["value_type"])
         writer.optional_guid(properties.get("id", None))
         writer.write(properties["value"])
         return len(properties["value"])
     elif property_type == "StructProperty":
-        del properties["custom_type"]
-        del properties["skip_type"]
         writer.fstring(properties["struct_type"])
         writer.guid(properties["struct_id"])
         writer.optional_guid(properties.get("id", None))
@@ -95,7 +99,51 @@ def skip_encode(writer: FArchiveWriter, property_type: str, properties: dict) ->
         )
 
 
-MAIN_SKIP_PROPERTIES = copy.deepcopy(PALWORLD_CUSTOM_PROPERTIES)
+def copy_path(container: dict, keys: tuple[str, ...]) -> dict:
+    """
+    Shallow-copies `container` and every dict on the `keys` path below it.
+    """
+    container = dict(container)
+    node = container
+    for key in keys:
+        node[key] = dict(node[key])
+        node = node[key]
+    return container
+
+
+def non_destructive(encode: Callable, entry_path: Optional[tuple[str, ...]] = ()) -> Callable:
+    """
+    palworld_save_tools encoders delete "custom_type" from the property they are
+    handed and swap its decoded value for bytes. This hands them a shallow copy,
+    plus copies down `entry_path` of each map entry, so the live tree survives
+    encoding; `entry_path` None deep-copies the property instead.
+    """
+    def encoder(writer: FArchiveWriter, property_type: str, properties: dict) -> int:
+        if entry_path is None:
+            return encode(writer, property_type, copy.deepcopy(properties))
+        properties = dict(properties)
+        if entry_path:
+            properties["value"] = [copy_path(entry, entry_path) for entry in properties["value"]]
+        return encode(writer, property_type, properties)
+    return encoder
+
+
+# Encoders that also write into each entry of their map, and the keys down to the dict written
+ENCODER_ENTRY_PATHS = {
+    ".worldSaveData.GroupSaveDataMap": ("value", "RawData"),
+    ".worldSaveData.BaseCampSaveData.Value.ModuleMap": ("value", "RawData", "value"),
+    # These rewrite nested data all the way down, but are always skip_decode'd below
+    ".worldSaveData.WorkSaveData": None,
+    ".worldSaveData.MapObjectSaveData": None,
+}
+
+SAVE_CUSTOM_PROPERTIES = {
+    path: (decode, non_destructive(encode, ENCODER_ENTRY_PATHS.get(path, ())))
+    for path, (decode, encode) in PALWORLD_CUSTOM_PROPERTIES.items()
+}
+
+
+MAIN_SKIP_PROPERTIES = copy.deepcopy(SAVE_CUSTOM_PROPERTIES)
 MAIN_SKIP_PROPERTIES[".worldSaveData.MapObjectSaveData"] = (skip_decode, skip_encode)
 MAIN_SKIP_PROPERTIES[".worldSaveData.FoliageGridSaveDataMap"] = (skip_decode, skip_encode)
 MAIN_SKIP_PROPERTIES[".worldSaveData.MapObjectSpawnerInStageSaveData"] = (skip_decode, skip_encode)
@@ -117,12 +165,28 @@ MAIN_SKIP_PROPERTIES[".worldSaveData.RandomizerSaveData"] = (skip_decode, skip_e
 MAIN_SKIP_PROPERTIES[".worldSaveData.GuildExtraSaveDataMap"] = (skip_decode, skip_encode)
 
 
-PLAYER_SKIP_PROPERTIES = copy.deepcopy(PALWORLD_CUSTOM_PROPERTIES)
+PLAYER_SKIP_PROPERTIES = copy.deepcopy(SAVE_CUSTOM_PROPERTIES)
 PLAYER_SKIP_PROPERTIES[".SaveData.PlayerCharacterMakeData"] = (skip_decode, skip_encode)
 PLAYER_SKIP_PROPERTIES[".SaveData.LastTransform"] = (skip_decode, skip_encode)
 PLAYER_SKIP_PROPERTIES[".SaveData.inventoryInfo"] = (skip_decode, skip_encode)
 # PLAYER_SKIP_PROPERTIES[".SaveData.RecordData"] = (skip_decode, skip_encode)
 
+
+# Players/<PlayerUId as 32 hex digits>.sav; other files there (e.g. *_dps.sav) aren't player saves
+PLAYER_SAV_PATTERN = re.compile(r"^[0-9A-Fa-f]{32}\.sav$")
+
+
+def read_player_sav(player_path: Path) -> tuple[GvasFile, int]:
+    """
+    Reads, decompresses and decodes one player save. Also runs in the player
+    sav pool started by SaveManager.open, so it only touches its arguments.
+    """
+    with Path(player_path).open("rb") as player_file:
+        player_data = player_file.read()
+    raw_gvas, compression_times = decompress_sav_to_gvas(player_data)
+    player_gvas_file = GvasFile.read(raw_gvas, PALWORLD_TYPE_HINTS, PLAYER_SKIP_PROPERTIES)
+    return player_gvas_file, compression_times
+
 class SaveManager:
     # Although these are class attrs, SaveManager itself is singleton so it should be fine?
     _instance = None
@@ -136,11 +200,23 @@ class SaveManager:
     player_mapping: Optional[dict[str, PlayerEntity]]
     baseworker_mapping: Optional[dict[str, PalEntity]]
     _dangling_pals: Optional[dict[str, PalEntity]]
+    # Pals added to or deleted from CharacterSaveParameterMap since Level.sav was read or last saved in place
+    _entities_dirty: bool = False
     
     container_data: Optional[ContainerData]
     group_data: Optional[GroupData]
     camp_data: Optional[BaseCampData]
 
+    # Decode player saves on a process pool while open() parses Level.sav. The lazy
+    # handles then take them without waiting, at the cost of holding every decoded
+    # save; set False to only decode a player sav when it is first used.
+    prefetch_player_savs: bool = True
+    # Player saves queued on the pool and not yet claimed by a player, by UUID2HexStr(PlayerUId)
+    _player_sav_futures: dict[str, Future] = {}
+    _player_sav_executor: Optional[ProcessPoolExecutor] = None
+    # Seconds spent in each phase of the last open()
+    open_timings: dict[str, float] = {}
+
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -184,6 +260,7 @@ class SaveManager:
         return sorted(self.baseworker_mapping.values(), key=lambda pal: (alphanumeric_key(pal.PalDeckID), pal.Level or 1))
 
     def _load_entities(self):
+        self._entities_dirty = False
         self.player_mapping = {}
         self._dangling_pals = {}
         self.baseworker_mapping = {}
@@ -210,13 +287,13 @@ class SaveManager:
                         LOGGER.warning(f"Player {uid_str} has no guild id")
                         continue
 
-                    player_gvas_file, player_compress_times = self.load_player_sav(uid_str)
+                    player_sav = self.load_player_sav(uid_str)
 
                     if uid_str in temp_player_pal_mapping:
-                        player_entity = PlayerEntity(group_id, entity, temp_player_pal_mapping[uid_str], player_gvas_file, player_compress_times)
+                        player_entity = PlayerEntity(group_id, entity, temp_player_pal_mapping[uid_str], player_sav)
                         del temp_player_pal_mapping[uid_str]
                     else:
-                        player_entity = PlayerEntity(group_id, entity, dict(), player_gvas_file, player_compress_times)
+                        player_entity = PlayerEntity(group_id, entity, dict(), player_sav)
                 
                     self.player_mapping[uid_str] = player_entity
                     LOGGER.info(f"Player Object Created: {player_entity}")
@@ -278,8 +355,62 @@ class SaveManager:
                 self._dangling_pals[str(pal.InstanceId)] = pal
                 LOGGER.warning(f"\t{pal}")
                 
+    @contextmanager
+    def _timed(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.open_timings[phase] = self.open_timings.get(phase, 0.0) + time.perf_counter() - start
+
+    def _prefetch_player_savs(self):
+        """
+        Starts decoding every save in Players/ on a process pool; load_player_sav
+        hands each future to the player's LazyPlayerSav. With fewer than two saves
+        or CPUs, or no pool available, player saves load inline on first use.
+        """
+        if self._player_sav_executor is not None:
+            # Saves of the previously opened world that nobody has used yet aren't needed anymore
+            self._player_sav_executor.shutdown(wait=False, cancel_futures=True)
+            self._player_sav_executor = None
+        self._player_sav_futures = {}
+        if not self.prefetch_player_savs:
+            return
+        workers = os.cpu_count() or 1
+        try:
+            player_paths = sorted(
+                path for path in (self._file_path / "Players").iterdir() if PLAYER_SAV_PATTERN.match(path.name)
+            )
+        except OSError:
+            return
+        if len(player_paths) < 2 or workers < 2:
+            return
+
+        executor = None
+        try:
+            executor = ProcessPoolExecutor(max_workers=min(len(player_paths), workers))
+            for player_path in player_paths:
+                self._player_sav_futures[player_path.stem.upper()] = executor.submit(read_player_sav, player_path)
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            LOGGER.warning(f"Can't start the player sav pool, loading player saves on first use: {e}")
+            self._player_sav_futures = {}
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            return
+        self._player_sav_executor = executor
+        LOGGER.info(f"Decoding {len(player_paths)} player saves on {min(len(player_paths), workers)} processes")
+
+    def _release_player_sav_prefetch(self):
+        # Saves nobody claimed (no matching player in Level.sav) are dropped; claimed ones keep decoding
+        for future in self._player_sav_futures.values():
+            future.cancel()
+        self._player_sav_futures = {}
+        if self._player_sav_executor is not None:
+            self._player_sav_executor.shutdown(wait=False)
+
     def open(self, file_path: str) -> Optional[GvasFile]:
         self._file_path = Path(file_path).resolve()
+        self.open_timings = {}
 
         level_sav_path = self._file_path / "Level.sav"
 
@@ -287,38 +418,57 @@ class SaveManager:
             LOGGER.error(f"Save file does not exist: {level_sav_path}.")
             return None
 
+        start = time.perf_counter()
+        with self._timed("start_player_savs"):
+            self._prefetch_player_savs()
+        try:
+            return self._open_level(level_sav_path)
+        finally:
+            self._release_player_sav_prefetch()
+            self.open_timings["total"] = time.perf_counter() - start
+            LOGGER.info("Open timings: " + ", ".join(
+                f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.open_timings.items()
+            ))
+
+    def _open_level(self, level_sav_path: Path) -> Optional[GvasFile]:
         LOGGER.info(f"Opening {level_sav_path}")
         with level_sav_path.open("rb") as file:
-            data = file.read()
+            with self._timed("read_level"):
+                data = file.read()
 
             try:
                 LOGGER.info("Decompressing sav")
-                self._raw_gvas, self._compression_times = decompress_sav_to_gvas(data)
+                with self._timed("decompress_level"):
+                    self._raw_gvas, self._compression_times = decompress_sav_to_gvas(data)
             except Exception as e:
                 LOGGER.error(f"Caught Exception: palworld_save_tools::palsav::decompress_sav_to_gvas: {e}")
                 return None
 
             LOGGER.info("Reading GVAS file")
-            self.gvas_file = GvasFile.read(
-                self._raw_gvas, PALWORLD_TYPE_HINTS, MAIN_SKIP_PROPERTIES
-            )
+            with self._timed("read_level_gvas"):
+                self.gvas_file = GvasFile.read(
+                    self._raw_gvas, PALWORLD_TYPE_HINTS, MAIN_SKIP_PROPERTIES
+                )
 
             PalObjects.TIME = PalObjects.get_BaseType(self.gvas_file.properties.get("Timestamp")) or PalObjects.TIME
 
             try:
-                self.group_data = GroupData(self.gvas_file)
+                with self._timed("group_data"):
+                    self.group_data = GroupData(self.gvas_file)
             except Exception as e:
                 LOGGER.error(f"Error parsing group data: {e}")
                 return None
             
             try:
-                self.camp_data = BaseCampData(self.gvas_file)
+                with self._timed("camp_data"):
+                    self.camp_data = BaseCampData(self.gvas_file)
             except Exception as e:
                 LOGGER.error(f"Error parsing base camp data: {e}")
                 return None
             
             try:
-                self.container_data = ContainerData(self.gvas_file)
+                with self._timed("container_data"):
+                    self.container_data = ContainerData(self.gvas_file)
             except Exception as e:
                 LOGGER.error(f"Error parsing container data: {e}")
                 return None
@@ -329,7 +479,8 @@ class SaveManager:
                 LOGGER.error(f"Unable to retrieve pal data: {e}")
                 return None
 
-            self._load_entities()
+            with self._timed("load_entities"):
+                self._load_entities()
 
             LOGGER.info("Done")
         return self.gvas_file
@@ -380,6 +531,7 @@ class SaveManager:
             if pal_container := self.container_data.get_container(popped_pal.ContainerId):
                 pal_container.del_pal(popped_pal.InstanceId)
             self._entities_list.remove(popped_pal._pal_obj)
+            self._entities_dirty = True
         except:
             LOGGER.warning(f"Error Deleting PAL {guid}: {traceback.format_exc()}")
             return False
@@ -400,6 +552,9 @@ class SaveManager:
         if player is None:
             LOGGER.warning(f"Player {player_uid} not found")
             return None
+        if player.is_player_sav_unloadable:
+            LOGGER.warning(f"Player SAV of {player} is unloadable, can't find its pal containers")
+            return None
         
         player_container_ids = [player.OtomoCharacterContainerId, player.PalStorageContainerId]
         
@@ -451,6 +606,7 @@ class SaveManager:
             if not player.add_pal(pal_entity):
                 raise Exception("Duplicated Pal ID, Try Again!")
             self._entities_list.append(pal_obj)
+            self._entities_dirty = True
         except:
             LOGGER.error(f"Failed adding pal: {traceback.format_exc()}")
             return None
@@ -496,38 +652,74 @@ class SaveManager:
         for player in self.player_mapping.values():
             self.save_player_sav(player, output_path)
 
+        saving_in_place = output_path == self._file_path
+        if not self.is_level_dirty():
+            if saving_in_place:
+                LOGGER.info("Level.sav unchanged, skipping")
+                return True
+            LOGGER.info(f"Copying unmodified Level.sav to {file_path}")
+            shutil.copyfile(self._file_path / "Level.sav", file_path)
+            return True
+
         LOGGER.info("Saving Level.sav...")
-        gvas_file = copy.deepcopy(self.gvas_file)
         LOGGER.info("Compressing Main GVAS file")
+        # The encoders leave the tree untouched, so the live one is written as is
         sav_data = compress_gvas_to_sav(
-            gvas_file.write(MAIN_SKIP_PROPERTIES), self._compression_times
+            self.gvas_file.write(MAIN_SKIP_PROPERTIES), self._compression_times
         )
 
         LOGGER.info(f"Saving to {file_path}")
         with file_path.open("wb") as file:
             file.write(sav_data)
         LOGGER.info(f"Saved to {file_path}")
+        # Changes are only clean relative to the save they were written to
+        if saving_in_place:
+            self._clear_level_dirty()
         return True
+
+    def _get_all_pals(self) -> list[PalEntity]:
+        pals = [*self.baseworker_mapping.values(), *self._dangling_pals.values()]
+        for player in self.get_players():
+            pals.extend(player.get_pals())
+        return pals
+
+    def is_level_dirty(self) -> bool:
+        """
+        Whether anything kept in Level.sav changed since it was read or last saved in place.
+        """
+        return (
+            self._entities_dirty
+            or any(player.is_dirty for player in self.get_players())
+            or any(pal.is_dirty for pal in self._get_all_pals())
+            or any(container.is_dirty for container in self.container_data.get_containers())
+            or any(group.is_dirty for group in self.group_data.get_groups())
+        )
+
+    def _clear_level_dirty(self):
+        self._entities_dirty = False
+        for entity in [
+            *self.get_players(),
+            *self._get_all_pals(),
+            *self.container_data.get_containers(),
+            *self.group_data.get_groups(),
+        ]:
+            entity.is_dirty = False
     
-    def load_player_sav(self, player_uid: str | UUID) -> GvasFile:
+    def load_player_sav(self, player_uid: str | UUID) -> LazyPlayerSav:
+        """
+        Only checks the player sav exists; it's decoded when the player's save data is
+        first read, or taken from the prefetch pool if open() queued it there.
+        """
         player_path: Path = self._file_path / "Players" / f"{UUID2HexStr(player_uid)}.sav"
-        LOGGER.info(f"Loading Player SAV: {player_path}")
         if not player_path.exists():
             LOGGER.error(f"Player SAV {str(player_path.absolute())} not exist")
             raise Exception(f"Player SAV {str(player_path.absolute())} not exist")
-        with player_path.open("rb") as player_file:
-            player_data = player_file.read()
-        raw_gvas, compression_times = decompress_sav_to_gvas(player_data)
-        player_gvas_file = GvasFile.read(raw_gvas, PALWORLD_TYPE_HINTS, PLAYER_SKIP_PROPERTIES)
-        return player_gvas_file, compression_times
+        return LazyPlayerSav(player_path, read_player_sav, self._player_sav_futures.pop(UUID2HexStr(player_uid), None))
     
     
     def save_player_sav(self, player_entity: PlayerEntity, save_path: Optional[Path] = None) -> bool:
-        if player_entity.PlayerGVAS is None:
-            return False
-
+        # Records for newly added pals go into the player sav, loading it if nothing else has
         player_entity.save_new_pal_records()
-        gvas_file, compression_times = player_entity.PlayerGVAS
         output_path = (save_path or self._file_path) / "Players"
         if not output_path.exists() and output_path.parent.exists():
             LOGGER.warning(f"Player path does not exist: {output_path}")
@@ -536,14 +728,27 @@ class SaveManager:
 
         player_path: Path = output_path / f"{UUID2HexStr(player_entity.PlayerUId)}.sav"
 
+        source_path: Path = player_entity.player_sav_path
+        saving_in_place = player_path.resolve() == source_path.resolve()
+        if not player_entity.is_player_sav_dirty:
+            # Unchanged since it was read (or never loaded): saving elsewhere only needs the original file
+            if saving_in_place:
+                return False
+            LOGGER.info(f"Copying unmodified Player SAV {source_path} to {player_path}")
+            shutil.copyfile(source_path, player_path)
+            return True
+
+        gvas_file, compression_times = player_entity.PlayerGVAS
+
         LOGGER.info(f"Compressing Player {player_entity} GVAS file")
-        player_gvas_file = copy.deepcopy(gvas_file)
         sav_data = compress_gvas_to_sav(
-            player_gvas_file.write(PLAYER_SKIP_PROPERTIES), compression_times
+            gvas_file.write(PLAYER_SKIP_PROPERTIES), compression_times
         )
 
         LOGGER.info(f"Saving to {player_path}")
         with player_path.open("wb") as file:
             file.write(sav_data)
         LOGGER.info(f"Saved to {player_path}")
+        if saving_in_place:
+            player_entity.is_player_sav_dirty = False
         return True
@@ -112,6 +112,9 @@ class Logger:
                 updated_value = getattr(instance, attr_name)
                 # Log the change using a logging mechanism (LOGGER needs to be defined)
                 self._print_change(instance, attr_name, old_value, updated_value)
+                # Entities tracking unsaved changes get told which attribute was set
+                if (mark_dirty := getattr(instance, "mark_dirty", None)) is not None:
+                    mark_dirty(attr_name)
                 return og_retval
             return wrapper
         return decorator
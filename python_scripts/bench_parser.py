@@ -0,0 +1,361 @@
+"""
+Scale benchmark for save_parser.
+
+Generates synthetic worlds at several pal counts and times each parser phase
+separately. Every size runs in a fresh interpreter so peak RSS is per size; the
+results land in a JSON file that --compare can check a later run against.
+With --input-modes, each size is also written to disk and parsed end to end
+once per input mode (read into memory, mmap, mmap plus spilled GVAS), each in
+its own interpreter so the peak RSS figures are comparable. Cold import time
+of the parser modules is measured in fresh interpreters as well, since a
+parser worker pays it before reading its first byte. With --allocations, each
+size also walks its GVAS once more under tracemalloc, counting the bytes
+slices taken off the buffer and the fields read through GvasReader; the
+slicing helpers GvasReader replaced took at least one slice per field read.
+"""
+
+import argparse
+import collections
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import save_parser
+import synthetic_save
+
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+INPUT_MODES = ("memory", "mmap", "spill")
+PALS_PER_PLAYER = 250
+PLAYERS_PER_GUILD = 4
+IMPORT_MODULES = ("save_parser", "save_index")
+IMPORT_TARGET_MS = 100
+EDITOR_PACKAGE = "palworld_pal_editor"
+READER_FIELD_METHODS = ("int32", "uint32", "uint64", "float", "bool", "fstring", "guid", "header")
+
+
+class SliceCountingBytes(bytes):
+    """
+    A GVAS buffer that counts the bytes slices taken off it. GvasReader reads
+    through a memoryview, which bypasses __getitem__, so only code slicing the
+    buffer itself is counted.
+    """
+
+    slices = 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            SliceCountingBytes.slices += 1
+        return super().__getitem__(key)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+def world_shape(pals: int) -> dict:
+    players = max(1, pals // PALS_PER_PLAYER)
+    return {
+        "players": players,
+        "guilds": max(1, players // PLAYERS_PER_GUILD),
+        "pals_per_player": pals // players,
+    }
+
+
+def timed(phases: dict, name: str, work: float, unit: str, fn, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        result = fn(*args)
+    seconds = time.perf_counter() - start
+    phases[name] = {
+        "seconds": round(seconds, 6),
+        "throughput": round(work / seconds, 1) if seconds else None,
+        "unit": unit,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    return result
+
+
+@contextlib.contextmanager
+def counting_reader_fields(counts: collections.Counter):
+    """
+    Counts calls of GvasReader's field read methods while active.
+    """
+    originals = {name: getattr(save_parser.GvasReader, name) for name in READER_FIELD_METHODS}
+
+    def counted(name, method):
+        def wrapper(reader, *args):
+            counts[name] += 1
+            return method(reader, *args)
+        return wrapper
+
+    try:
+        for name, method in originals.items():
+            setattr(save_parser.GvasReader, name, counted(name, method))
+        yield
+    finally:
+        for name, method in originals.items():
+            setattr(save_parser.GvasReader, name, method)
+
+
+def measure_allocations(gvas) -> dict:
+    """
+    Walks `gvas` like the parse_gvas_properties phase under tracemalloc and
+    reports the bytes slices taken off the buffer, the fields read through
+    GvasReader, and the walk's traced peak and retained memory.
+    """
+    data = SliceCountingBytes(gvas)
+    SliceCountingBytes.slices = 0
+    counts = collections.Counter()
+    tracemalloc.start()
+    try:
+        with counting_reader_fields(counts), contextlib.redirect_stdout(open(os.devnull, "w")):
+            reader = save_parser.GvasReader(data)
+            save_parser.parse_gvas_header(reader)
+            properties = save_parser.parse_gvas_properties(reader, selection=save_parser.BREEDER_SELECTION)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del properties
+    return {
+        "buffer_slices": SliceCountingBytes.slices,
+        "reader_field_reads": sum(counts.values()),
+        "reader_field_reads_by_method": dict(counts),
+        "traced_peak_mb": round(peak / 1024 / 1024, 1),
+        "traced_retained_mb": round(retained / 1024 / 1024, 1),
+    }
+
+
+def run_size(pals: int, passives_per_pal: int, filler: int, seed: int, allocations: bool = False) -> dict:
+    shape = world_shape(pals)
+    sav = synthetic_save.generate_level_sav(
+        shape["players"], shape["guilds"], shape["pals_per_player"], passives_per_pal, filler, seed
+    )
+    generated_rss = peak_rss_mb()
+    pal_count = shape["players"] * shape["pals_per_player"]
+
+    phases = {}
+    gvas, _ = timed(phases, "decompress_gvas", len(sav), "compressed bytes/s",
+                    save_parser.decompress_gvas, sav, "synthetic")
+
+    def walk():
+        reader = save_parser.GvasReader(gvas)
+        save_parser.parse_gvas_header(reader)
+        return save_parser.parse_gvas_properties(reader, selection=save_parser.BREEDER_SELECTION)
+
+    properties = timed(phases, "parse_gvas_properties", len(gvas), "bytes/s", walk)
+    timed(phases, "load_character_save_parameter_map", pal_count, "pals/s",
+          save_parser.load_character_save_parameter_map, properties)
+    # parse_guild_data runs the character map pass again internally
+    timed(phases, "parse_guild_data", pal_count, "pals/s", save_parser.parse_guild_data, properties)
+
+    run = {
+        "pals": pal_count,
+        **shape,
+        "passives_per_pal": passives_per_pal,
+        "filler": filler,
+        "sav_bytes": len(sav),
+        "gvas_bytes": len(gvas),
+        "generated_rss_mb": generated_rss,
+        "phases": phases,
+    }
+    if allocations:
+        # After the timed phases, so tracing and the counters don't skew them
+        del properties
+        run["allocations"] = measure_allocations(gvas)
+    return run
+
+
+def run_input_mode(sav_path: str, mode: str) -> dict:
+    """
+    Parses a save from disk the way the CLI does in `mode` and reports time and peak RSS.
+    """
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        if mode == "memory":
+            file_content = save_parser.read_file(sav_path)
+        else:
+            file_content = save_parser.map_file(sav_path)
+        spill_dir = tempfile.gettempdir() if mode == "spill" else None
+        guilds, _ = save_parser.parse_save_file(file_content, sav_path, spill_dir=spill_dir)
+    return {
+        "seconds": round(time.perf_counter() - start, 6),
+        "peak_rss_mb": peak_rss_mb(),
+        "pals": sum(len(member.pals) for guild in guilds for member in guild.members),
+    }
+
+
+def measure_import(module: str, runs: int) -> dict:
+    """
+    Times `import <module>` in `runs` fresh interpreters, excluding interpreter
+    startup, and reports whether it pulled in the editor package.
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = (time.perf_counter() - start) * 1000\n"
+        f"print(elapsed, any(name.split('.')[0] == {EDITOR_PACKAGE!r} for name in sys.modules))\n"
+    )
+    samples = []
+    editor_loaded = False
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout
+        elapsed, loaded = output.strip().splitlines()[-1].split()
+        samples.append(float(elapsed))
+        editor_loaded = editor_loaded or loaded == "True"
+    samples.sort()
+    return {
+        "median_ms": round(samples[len(samples) // 2], 3),
+        "min_ms": round(samples[0], 3),
+        "max_ms": round(samples[-1], 3),
+        "runs": runs,
+        "editor_loaded": editor_loaded,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns a line per phase that got slower than baseline by more than `tolerance`.
+    """
+    previous = {run["pals"]: run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in results["runs"]:
+        base = previous.get(run["pals"])
+        if base is None:
+            continue
+        for name, phase in run["phases"].items():
+            base_phase = base["phases"].get(name)
+            if not base_phase or not base_phase["seconds"]:
+                continue
+            ratio = phase["seconds"] / base_phase["seconds"]
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{name} @ {run['pals']} pals: {base_phase['seconds']:.3f}s -> {phase['seconds']:.3f}s ({ratio:.2f}x)"
+                )
+    for module, timing in results.get("imports", {}).items():
+        base = baseline.get("imports", {}).get(module)
+        if base and base["median_ms"] and timing["median_ms"] / base["median_ms"] > 1 + tolerance:
+            regressions.append(f"import {module}: {base['median_ms']:.1f}ms -> {timing['median_ms']:.1f}ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark save_parser phases on synthetic worlds.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Pal counts to benchmark.")
+    parser.add_argument("--passives-per-pal", type=int, default=2)
+    parser.add_argument("--filler", type=int, default=0, help="MapObjectSaveData entries added to every world.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the results file.")
+    parser.add_argument("--compare", help="Previous results file to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown per phase for --compare.")
+    parser.add_argument(
+        "--input-modes", nargs="*", choices=INPUT_MODES, default=[],
+        help="Also parse each world from disk in these input modes and record their peak RSS.",
+    )
+    parser.add_argument(
+        "--allocations", action="store_true",
+        help="Also count buffer slices and field reads of the property walk and trace its memory.",
+    )
+    parser.add_argument(
+        "--import-runs", type=int, default=5,
+        help="Fresh interpreters to time each parser module's cold import in; 0 skips it.",
+    )
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--parse-file", nargs=2, metavar=("PATH", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single is not None:
+        print(json.dumps(run_size(args.single, args.passives_per_pal, args.filler, args.seed, args.allocations)))
+        return
+    if args.parse_file:
+        print(json.dumps(run_input_mode(*args.parse_file)))
+        return
+
+    imports = {}
+    for module in IMPORT_MODULES if args.import_runs > 0 else ():
+        timing = imports[module] = measure_import(module, args.import_runs)
+        notes = []
+        if timing["median_ms"] > IMPORT_TARGET_MS:
+            notes.append(f"over the {IMPORT_TARGET_MS} ms target")
+        if timing["editor_loaded"]:
+            notes.append(f"imports {EDITOR_PACKAGE}")
+        print(f"import {module}: {timing['median_ms']:.1f} ms median" + "".join(f", {note}" for note in notes))
+
+    runs = []
+    for pals in args.sizes:
+        command = [
+            sys.executable, os.path.abspath(__file__), "--single", str(pals),
+            "--passives-per-pal", str(args.passives_per_pal),
+            "--filler", str(args.filler), "--seed", str(args.seed),
+        ]
+        if args.allocations:
+            command.append("--allocations")
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        run = json.loads(output.strip().splitlines()[-1])
+        runs.append(run)
+        summary = ", ".join(f"{name} {phase['seconds']:.3f}s" for name, phase in run["phases"].items())
+        print(f"{run['pals']} pals: {summary}, peak RSS {run['phases']['parse_guild_data']['peak_rss_mb']} MB")
+        if "allocations" in run:
+            counts = run["allocations"]
+            print(
+                f"{run['pals']} pals walk: {counts['buffer_slices']} buffer slices, "
+                f"{counts['reader_field_reads']} field reads, traced peak {counts['traced_peak_mb']} MB"
+            )
+
+        if args.input_modes:
+            shape = world_shape(pals)
+            with tempfile.TemporaryDirectory() as directory:
+                sav_path = os.path.join(directory, "Level.sav")
+                with open(sav_path, "wb") as f:
+                    f.write(synthetic_save.generate_level_sav(
+                        shape["players"], shape["guilds"], shape["pals_per_player"],
+                        args.passives_per_pal, args.filler, args.seed,
+                    ))
+                run["input_modes"] = {}
+                for mode in args.input_modes:
+                    command = [sys.executable, os.path.abspath(__file__), "--parse-file", sav_path, mode]
+                    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+                    run["input_modes"][mode] = json.loads(output.strip().splitlines()[-1])
+            summary = ", ".join(
+                f"{mode} {result['seconds']:.3f}s / {result['peak_rss_mb']} MB" for mode, result in run["input_modes"].items()
+            )
+            print(f"{run['pals']} pals input modes: {summary}")
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parser_version": save_parser.PARSER_VERSION,
+        "imports": imports,
+        "runs": runs,
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Breeding-combination engine for the breeder.
+
+Species come from the editor's pal data, extended by breeding_data.json with
+each species' breeding rank (the game's CombiRank), the unique combinations
+that override the rank rule and the species that only breed true. All child
+species are resolved once at load time into a species x species uint16
+matrix, so a pair lookup is a single array index.
+"""
+
+import json
+import os
+import re
+from array import array
+from bisect import bisect_left
+
+from save_core import load_editor_data
+
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "breeding_data.json")
+NO_CHILD = 0xFFFF
+# Variant wrappers around a species key in CharacterID, as PalEntity.RawSpecieKey strips them
+CHARACTER_ID_PATTERN = re.compile(r"^(?:BOSS_|Boss_)?(?:(?:GYM|RAID|PREDATOR|SUMMON)_)?(.+?)(?:_MAX)?(?:_Oilrig)?(?:_\d+.*)?$")
+
+
+def species_key(character_id: str) -> str:
+    """
+    Maps a save's CharacterID (e.g. "BOSS_SheepBall", "PREDATOR_Garm") to its species key.
+    """
+    match = CHARACTER_ID_PATTERN.match(character_id or "")
+    return match.group(1) if match else character_id
+
+
+class BreedingTable:
+    """
+    Child species of every pair of breedable species.
+
+    A pair of the same species yields that species, a unique combination
+    yields its fixed child, and any other pair yields the species whose rank is
+    closest to floor((rank_a + rank_b + 1) / 2), ties going to the species
+    listed first. Children of unique combinations and `same_species_only`
+    species are never picked by rank. Species without a rank aren't breedable
+    and look up as None.
+    """
+
+    def __init__(self, ranks: dict, unique=(), same_species_only=(), pal_data: dict = None):
+        if pal_data is None:
+            # The editor's PAL_DATA, read without importing its data_provider
+            pal_data = load_editor_data("pal_data.json") | load_editor_data("human_data.json")
+        self.species = [
+            name for name in ranks
+            if name in pal_data and not pal_data[name].get("Invalid") and not pal_data[name].get("Human")
+        ]
+        if len(self.species) >= NO_CHILD:
+            raise ValueError(f"Too many species for a uint16 matrix: {len(self.species)}")
+        self.index = {name: i for i, name in enumerate(self.species)}
+        self._by_casefold = {name.casefold(): i for i, name in enumerate(self.species)}
+        self.ranks = array("H", (ranks[name] for name in self.species))
+        self.unique = {}
+        for parent_a, parent_b, child in unique:
+            if parent_a in self.index and parent_b in self.index and child in self.index:
+                self.unique[frozenset((self.index[parent_a], self.index[parent_b]))] = self.index[child]
+        excluded = set(self.unique.values()) | {self.index[name] for name in same_species_only if name in self.index}
+        self.children = self._build_matrix(excluded)
+        self._parents = None
+
+    @classmethod
+    def load(cls, path: str = DATA_PATH, pal_data: dict = None) -> "BreedingTable":
+        with open(path, "r", encoding="utf8") as f:
+            data = json.load(f)
+        return cls(data["ranks"], data.get("unique", ()), data.get("same_species_only", ()), pal_data)
+
+    def _build_matrix(self, excluded: set) -> array:
+        count = len(self.species)
+        ranks = self.ranks
+        # Rank-pickable species by rank; of species sharing a rank the first listed wins
+        by_rank = {}
+        for i in range(count):
+            if i not in excluded:
+                by_rank.setdefault(ranks[i], i)
+        candidate_ranks = sorted(by_rank)
+        children = array("H", [NO_CHILD]) * (count * count)
+        for a in range(count):
+            for b in range(a, count):
+                if a == b:
+                    child = a
+                else:
+                    child = self.unique.get(frozenset((a, b)))
+                    if child is None:
+                        child = self._closest(by_rank, candidate_ranks, (ranks[a] + ranks[b] + 1) // 2)
+                children[a * count + b] = child
+                children[b * count + a] = child
+        return children
+
+    @staticmethod
+    def _closest(by_rank: dict, candidate_ranks: list, target: int) -> int:
+        if not candidate_ranks:
+            return NO_CHILD
+        position = bisect_left(candidate_ranks, target)
+        # The closest rank is at `position` or just below it
+        nearby = [candidate_ranks[p] for p in (position - 1, position) if 0 <= p < len(candidate_ranks)]
+        return min((abs(rank - target), by_rank[rank]) for rank in nearby)[1]
+
+    def species_index(self, species: str):
+        """
+        Returns the matrix index of a species key or CharacterID, or None if it isn't breedable.
+        """
+        i = self.index.get(species)
+        if i is None:
+            i = self._by_casefold.get(species_key(species).casefold())
+        return i
+
+    def child_index(self, a: int, b: int) -> int:
+        return self.children[a * len(self.species) + b]
+
+    def child(self, parent_a: str, parent_b: str):
+        """
+        Returns the child species key of two species (keys or CharacterIDs), or None.
+        """
+        a = self.species_index(parent_a)
+        b = self.species_index(parent_b)
+        if a is None or b is None:
+            return None
+        child = self.children[a * len(self.species) + b]
+        return None if child == NO_CHILD else self.species[child]
+
+    def parents(self, child: str) -> list:
+        """
+        Returns every (parent_a, parent_b) species pair, a <= b in table order, that yields `child`.
+        """
+        if self._parents is None:
+            count = len(self.species)
+            parents = [[] for _ in range(count)]
+            children = self.children
+            for a in range(count):
+                row = a * count
+                for b in range(a, count):
+                    child_index = children[row + b]
+                    if child_index != NO_CHILD:
+                        parents[child_index].append((a, b))
+            self._parents = parents
+        i = self.species_index(child)
+        if i is None:
+            return []
+        return [(self.species[a], self.species[b]) for a, b in self._parents[i]]
+
+    def pair_children(self, pals) -> list:
+        """
+        Resolves every unordered pair of `pals` in one pass.
+
+        `pals` are objects with `id` and `name` (the species key or CharacterID,
+        like save_parser.Pal). Returns (pal_a.id, pal_b.id, child species key)
+        for each pair whose parents are both breedable.
+        """
+        count = len(self.species)
+        indexed = [(pal.id, self.species_index(pal.name)) for pal in pals]
+        indexed = [(pal_id, i) for pal_id, i in indexed if i is not None]
+        children = self.children
+        species = self.species
+        results = []
+        for position, (id_a, a) in enumerate(indexed):
+            row = a * count
+            results.extend(
+                (id_a, id_b, species[children[row + b]])
+                for id_b, b in indexed[position + 1:]
+                if children[row + b] != NO_CHILD
+            )
+        return results
+
+    def guild_children(self, guild) -> list:
+        """
+        pair_children over the pals of every member of a save_parser.Guild.
+        """
+        return self.pair_children(pal for member in guild.members for pal in member.pals)
+
@@ -0,0 +1,351 @@
+"""
+Multi-generation breeding path search.
+
+Starting from a guild roster, BreedingSearch finds the fewest generations of
+breeding that produce a target species carrying a set of wanted passives.
+Parents aren't used up by breeding, so a plan is a tree whose depth is its
+generation count. The search is A* over (species, wanted passive set) items,
+ordered by generation plus each species' distance to the target in the "is a
+parent of" graph; that distance never overestimates, since any chain of
+breedings from a species to the target is at least that long. Every item is
+settled once, at its fewest generations, and memoized with the breeding tree
+that produces it.
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import math
+import time
+from collections import deque
+from functools import lru_cache
+
+from breeding import NO_CHILD, BreedingTable
+
+
+MAX_PASSIVES = 4
+# Chance that a child inherits 1, 2, 3 or 4 passives drawn from its parents' pool
+INHERIT_COUNT_WEIGHTS = ((1, 0.4), (2, 0.3), (3, 0.2), (4, 0.1))
+UNREACHABLE = 0xFFFF
+DEFAULT_MAX_GENERATIONS = 5
+DEFAULT_TIME_BUDGET_MS = 250
+DEFAULT_LIMIT = 5
+
+
+@lru_cache(maxsize=None)
+def inherit_probability(pool: int, wanted: int) -> float:
+    """
+    Chance that a child inherits `wanted` specific passives out of its parents'
+    `pool` distinct passives.
+    """
+    if wanted == 0:
+        return 1.0
+    probability = 0.0
+    for count, weight in INHERIT_COUNT_WEIGHTS:
+        # A child can't inherit more passives than the pool holds
+        count = min(count, pool)
+        if count >= wanted:
+            probability += weight * math.comb(pool - wanted, count - wanted) / math.comb(pool, count)
+    return probability
+
+
+def passive_key(passive) -> str:
+    """
+    Passives arrive as save_parser names or as the UI's Passive objects.
+    """
+    return passive.get("id") or passive.get("name") if isinstance(passive, dict) else passive
+
+
+def guild_roster(guild) -> list:
+    """
+    The (pal id, species, passives) roster of a save_parser.Guild.
+    """
+    return [(pal.id, pal.name, pal.passives) for member in guild.members for pal in member.pals]
+
+
+class Bred:
+    """
+    How one (species, mask) item is obtained: a roster pal (`pal_id`), or a
+    breeding of `parents` together with every bred item of its tree.
+    """
+
+    __slots__ = ("generation", "probability", "step_probability", "parents", "tree", "pal_id", "pool")
+
+    def __init__(self, generation, probability, step_probability=1.0, parents=None, tree=frozenset(), pal_id=None, pool=0):
+        self.generation = generation
+        self.probability = probability
+        self.step_probability = step_probability
+        self.parents = parents
+        self.tree = tree
+        self.pal_id = pal_id
+        # Distinct passives the pal carries, wanted or not
+        self.pool = pool
+
+    def rank(self) -> tuple:
+        return (self.generation, len(self.tree), -self.probability)
+
+
+class BreedingSearch:
+    """
+    A* breeding planner over one BreedingTable.
+
+    search() takes a roster of (pal id, species or CharacterID, passives) and
+    returns up to `limit` plans ranked by generations, then breedings, then
+    the odds of every child carrying its wanted passives. Only wanted passives
+    are tracked: a child is assumed able to carry every wanted passive of both
+    parents, and each step's probability is the chance it actually does.
+    Plans deeper than `max_generations` aren't considered, and the search
+    stops at the time budget, reporting whether it ran to completion.
+    """
+
+    def __init__(self, table: BreedingTable):
+        self.table = table
+        count = len(table.species)
+        children = table.children
+        parents_of = [set() for _ in range(count)]
+        for a in range(count):
+            row = a * count
+            for b in range(a + 1, count):
+                child = children[row + b]
+                if child != NO_CHILD:
+                    parents_of[child].update((a, b))
+        self._parents_of = [sorted(parents) for parents in parents_of]
+        self._distances = {}
+
+    def distances(self, target: int) -> list:
+        """
+        Breedings from each species to `target` if a suitable partner were
+        always at hand; UNREACHABLE where no chain of breedings leads there.
+        """
+        distances = self._distances.get(target)
+        if distances is None:
+            distances = [UNREACHABLE] * len(self.table.species)
+            distances[target] = 0
+            queue = deque((target,))
+            while queue:
+                child = queue.popleft()
+                for parent in self._parents_of[child]:
+                    if distances[parent] == UNREACHABLE:
+                        distances[parent] = distances[child] + 1
+                        queue.append(parent)
+            self._distances[target] = distances
+        return distances
+
+    def search(
+        self,
+        roster,
+        target: str,
+        passives=(),
+        max_generations: int = DEFAULT_MAX_GENERATIONS,
+        time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+        limit: int = DEFAULT_LIMIT,
+    ) -> dict:
+        started = time.perf_counter()
+        table = self.table
+        target_index = table.species_index(target)
+        if target_index is None:
+            raise ValueError(f"Unknown or unbreedable species: {target}")
+        wanted = list(dict.fromkeys(passive_key(passive) for passive in passives))
+        if len(wanted) > MAX_PASSIVES:
+            raise ValueError(f"A pal carries at most {MAX_PASSIVES} passives, {len(wanted)} requested")
+        bits = {passive: 1 << i for i, passive in enumerate(wanted)}
+        goal = (target_index, (1 << len(wanted)) - 1)
+
+        # One roster pal per item; of pals alike, the one with the fewest other passives breeds best
+        owned = {}
+        for pal_id, species, pal_passives in roster:
+            species_index = table.species_index(species)
+            if species_index is None:
+                continue
+            keys = {passive_key(passive) for passive in pal_passives}
+            mask = 0
+            for key in keys:
+                mask |= bits.get(key, 0)
+            item = (species_index, mask)
+            if item not in owned or len(keys) < owned[item].pool:
+                owned[item] = Bred(0, 1.0, pal_id=pal_id, pool=len(keys))
+
+        result = {
+            "target": table.species[target_index],
+            "passives": wanted,
+            "paths": [],
+            "complete": True,
+            "settled": 0,
+        }
+        owned_mask = 0
+        for _, mask in owned:
+            owned_mask |= mask
+        missing = [passive for passive in wanted if not owned_mask & bits[passive]]
+        if missing:
+            result["missing_passives"] = missing
+        elif goal in owned:
+            result["paths"].append(self._describe(goal, owned[goal], owned, wanted))
+        else:
+            deadline = started + time_budget_ms / 1000
+            found, settled = self._run(owned, goal, max_generations, deadline, limit, result)
+            result["paths"] = [self._describe(goal, bred, settled, wanted) for bred in found]
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+
+    def _run(self, owned: dict, goal, max_generations, deadline, limit, result) -> tuple:
+        """
+        Settles items in A* order. Returns the best `limit` ways found to
+        breed `goal` and the settled items their trees refer to.
+        """
+        count = len(self.table.species)
+        children = self.table.children
+        distances = self.distances(goal[0])
+
+        def estimate(item):
+            # An owned target species still needs a breeding to gain the missing passives
+            return 1 if item[0] == goal[0] and item != goal else distances[item[0]]
+
+        best = {}
+        heap = []
+        counter = itertools.count()
+        for item, bred in owned.items():
+            # Species that can't lead to the target can't be a partner on the way either
+            if distances[item[0]] != UNREACHABLE:
+                best[item] = bred
+                heapq.heappush(heap, (estimate(item), 0, next(counter), item, bred))
+        settled = {}
+        settled_masks = {}
+        found = []
+
+        while heap:
+            if time.perf_counter() > deadline:
+                result["complete"] = False
+                break
+            f, _, _, item, bred = heapq.heappop(heap)
+            # Whatever is left breeds the goal no sooner than `f` generations
+            if len(found) >= limit and f > found[limit - 1].generation:
+                break
+            if best.get(item) is not bred:
+                continue
+            species, mask = item
+            # Of no use when a pal of its species with at least its passives was settled as early
+            if any(mask & other == mask and generation <= bred.generation for other, generation in settled_masks.get(species, ())):
+                continue
+            settled[item] = bred
+            settled_masks.setdefault(species, []).append((mask, bred.generation))
+            row = species * count
+            for partner_item, partner in settled.items():
+                child = children[row + partner_item[0]]
+                if child == NO_CHILD or distances[child] == UNREACHABLE:
+                    continue
+                child_item = (child, mask | partner_item[1])
+                generation = max(bred.generation, partner.generation) + 1
+                if child_item == goal:
+                    if generation > max_generations:
+                        continue
+                elif (
+                    generation + estimate(child_item) > max_generations
+                    or child_item in settled
+                    or (child_item in best and best[child_item].generation <= generation)
+                ):
+                    continue
+                pool = bred.pool + partner.pool - bin(mask & partner_item[1]).count("1")
+                wanted = bin(child_item[1]).count("1")
+                step_probability = inherit_probability(pool, wanted)
+                tree = bred.tree | partner.tree
+                probability = step_probability
+                for tree_item in tree:
+                    probability *= settled[tree_item].step_probability
+                child_bred = Bred(
+                    generation, probability, step_probability, (item, partner_item), tree | {child_item}, pool=wanted
+                )
+                if child_item == goal:
+                    found.append(child_bred)
+                    found.sort(key=Bred.rank)
+                    continue
+                best[child_item] = child_bred
+                heapq.heappush(heap, (generation + estimate(child_item), -generation, next(counter), child_item, child_bred))
+
+        result["settled"] = len(settled)
+        return found[:limit], settled
+
+    def _describe(self, goal, bred: Bred, settled: dict, wanted: list) -> dict:
+        """
+        Lays a breeding tree out as steps in generation order, each parent
+        being a roster pal id or an earlier step.
+        """
+        species = self.table.species
+        lookup = {**settled, goal: bred}
+        positions = {}
+        steps = []
+        for item in sorted(bred.tree, key=lambda item: (lookup[item].generation, item)):
+            step = lookup[item]
+            parents = []
+            for parent in step.parents:
+                if parent in positions:
+                    parents.append({"step": positions[parent]})
+                else:
+                    parents.append({"pal": lookup[parent].pal_id})
+            positions[item] = len(steps)
+            steps.append({
+                "parents": parents,
+                "species": species[item[0]],
+                "passives": [passive for i, passive in enumerate(wanted) if item[1] >> i & 1],
+                "generation": step.generation,
+                "probability": round(step.step_probability, 6),
+            })
+        path = {
+            "steps": steps,
+            "generations": bred.generation,
+            "breedings": len(steps),
+            "probability": round(bred.probability, 6),
+            "eggs": sum(math.ceil(1 / step["probability"]) for step in steps),
+        }
+        if not steps:
+            path["pal"] = bred.pal_id
+        return path
+
+
+@lru_cache(maxsize=None)
+def default_search() -> BreedingSearch:
+    return BreedingSearch(BreedingTable.load())
+
+
+def search_request(request: dict) -> dict:
+    """
+    Runs a search for a worker request:
+    {"pals": [{"id", "name", "passives"}], "target", "passives"?, "max_generations"?, "time_budget_ms"?, "limit"?}.
+    """
+    roster = [(pal["id"], pal["name"], pal.get("passives") or ()) for pal in request.get("pals") or ()]
+    return default_search().search(
+        roster,
+        request["target"],
+        request.get("passives") or (),
+        int(request.get("max_generations") or DEFAULT_MAX_GENERATIONS),
+        float(request.get("time_budget_ms") or DEFAULT_TIME_BUDGET_MS),
+        int(request.get("limit") or DEFAULT_LIMIT),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search breeding paths from the guild rosters of a Level.sav.")
+    parser.add_argument("file_path", help="Path to the Level.sav file.")
+    parser.add_argument("target", help="Species key or CharacterID to breed.")
+    parser.add_argument("--passives", nargs="*", default=[], help="Passives the bred pal should carry.")
+    parser.add_argument("--guild", help="Only search from this guild (id or name); default is every guild.")
+    parser.add_argument("--max-generations", type=int, default=DEFAULT_MAX_GENERATIONS)
+    parser.add_argument("--time-budget-ms", type=float, default=DEFAULT_TIME_BUDGET_MS)
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    args = parser.parse_args(argv)
+
+    from save_parser import parse_save_file, read_file
+
+    guilds, _ = parse_save_file(read_file(args.file_path, text=False), args.file_path)
+    results = {}
+    for guild in guilds:
+        if args.guild and args.guild not in (guild.id, guild.guildName):
+            continue
+        results[guild.id] = default_search().search(
+            guild_roster(guild), args.target, args.passives, args.max_generations, args.time_budget_ms, args.limit
+        )
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
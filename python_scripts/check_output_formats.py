@@ -0,0 +1,139 @@
+"""
+Round-trip check of save_parser's msgpack output against its JSON output.
+
+Generates a synthetic world, encodes the parse result the way the worker does
+in both formats and both roster layouts, and checks that the decoded msgpack
+equals the decoded JSON, with the msgpack package and with the pure-Python
+fallback encoder in msgpack_lite. The fallback is then checked against the
+msgpack package on the edges of every int, str, bin, array and map size
+class. Needs the msgpack package to decode; exits non-zero on any mismatch.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+import msgpack_lite
+import save_parser
+import synthetic_save
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+EDGE_INTS = (
+    0, 1, 0x7F, 0x80, 0xFF, 0x100, 0xFFFF, 0x10000, 0xFFFFFFFF, 0x100000000, 0xFFFFFFFFFFFFFFFF,
+    -1, -0x20, -0x21, -0x80, -0x81, -0x8000, -0x8001, -0x80000000, -0x80000001, -0x8000000000000000,
+)
+EDGE_LENGTHS = (0, 1, 15, 16, 31, 32, 0xFF, 0x100, 0xFFFF, 0x10000)
+
+
+def edge_values() -> list:
+    values = [None, True, False, 0.0, -1.5, 1e300, float("inf")]
+    values += EDGE_INTS
+    for length in EDGE_LENGTHS:
+        values.append("x" * length)
+        values.append(bytes(length))
+        values.append(list(range(length % 0x100)) if length < 0x10000 else [0] * length)
+        values.append({str(i): i for i in range(length)})
+    values += ["é" * 20, "漢字" * 40, bytearray(b"\x00\xff"), memoryview(b"abc"), (1, "two", b"3")]
+    return values
+
+
+def normalize(value):
+    # msgpack decodes tuples as lists and every bin as bytes
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    return value
+
+
+@contextlib.contextmanager
+def fallback_encoder():
+    """
+    Makes msgpack_lite encode with its pure-Python fallback while active.
+    """
+    installed, msgpack_lite.msgpack = msgpack_lite.msgpack, None
+    try:
+        yield
+    finally:
+        msgpack_lite.msgpack = installed
+
+
+def check_fallback_encoder() -> list:
+    """
+    Returns a line per edge value the pure-Python encoder gets wrong.
+    """
+    failures = []
+    with fallback_encoder():
+        for value in edge_values():
+            packed = msgpack_lite.packb(value)
+            expected = msgpack.packb(value, use_bin_type=True)
+            decoded = msgpack.unpackb(packed, raw=False, strict_map_key=False)
+            label = f"{type(value).__name__} {repr(value)[:40]}"
+            if decoded != normalize(value):
+                failures.append(f"fallback decodes {label} as {repr(decoded)[:40]}")
+            elif packed != expected:
+                failures.append(f"fallback encodes {label} differently from msgpack")
+    return failures
+
+
+def check_layouts(players: int, guilds: int, pals_per_player: int, seed: int) -> list:
+    """
+    Returns a line per roster layout whose msgpack payload differs from its JSON payload.
+    """
+    sav = synthetic_save.generate_level_sav(players, guilds, pals_per_player, 2, 0, seed)
+    failures = []
+    for layout in save_parser.ROSTER_LAYOUTS:
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            guilds_out, player_data = save_parser.parse_save_file_cached(sav, "synthetic", layout=layout)
+        if not player_data:
+            failures.append(f"{layout}: the synthetic save parsed to no players")
+            continue
+        payload = {"guilds": guilds_out, "playerData": player_data}
+        json_payload = save_parser.encode_payload(payload, "json")
+        msgpack_payload = save_parser.encode_payload(payload, "msgpack")
+        with fallback_encoder():
+            fallback_payload = save_parser.encode_payload(payload, "msgpack")
+        expected = json.loads(json_payload)
+        if msgpack.unpackb(msgpack_payload, raw=False) != expected:
+            failures.append(f"{layout}: msgpack payload differs from the JSON payload")
+        elif msgpack.unpackb(fallback_payload, raw=False) != expected:
+            failures.append(f"{layout}: fallback msgpack payload differs from the JSON payload")
+        else:
+            print(f"{layout}: msgpack matches JSON ({len(msgpack_payload)} vs {len(json_payload)} bytes)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check save_parser's msgpack output against its JSON output.")
+    parser.add_argument("--players", type=int, default=12)
+    parser.add_argument("--guilds", type=int, default=3)
+    parser.add_argument("--pals-per-player", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if msgpack is None:
+        print("The msgpack package is needed to decode the output; pip install msgpack", file=sys.stderr)
+        sys.exit(2)
+
+    failures = check_layouts(args.players, args.guilds, args.pals_per_player, args.seed)
+    fallback_failures = check_fallback_encoder()
+    if not fallback_failures:
+        print(f"fallback encoder: {len(edge_values())} edge values match msgpack")
+    failures += fallback_failures
+    for line in failures:
+        print(f"MISMATCH {line}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import collections
+import sys
+import time
+
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+LEVEL_NAMES = {value: name.upper() for name, value in LEVELS.items()}
+
+
+class Diagnostics:
+    """
+    Leveled parser diagnostics kept off the result stream.
+
+    Events at or above `level` go into a ring buffer holding the last
+    `capacity` of them; messages are %-formatted only when written, so a
+    recorded event costs a tuple. Nothing is written while a parse goes well:
+    dump() writes the buffer to stderr when one fails, and `echo` writes every
+    recorded event as it happens instead. Hot loops should test enabled(level)
+    once before the loop rather than call debug() per iteration.
+    """
+
+    def __init__(self, level: int = INFO, capacity: int = 512, echo: bool = False):
+        self.level = level
+        self.echo = echo
+        self.events = collections.deque(maxlen=capacity)
+        self.recorded = 0
+
+    def configure(self, level: int = None, capacity: int = None, echo: bool = None):
+        if level is not None:
+            self.level = level
+        if capacity is not None and capacity != self.events.maxlen:
+            self.events = collections.deque(self.events, maxlen=capacity)
+        if echo is not None:
+            self.echo = echo
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.level
+
+    def log(self, level: int, message: str, *args):
+        if level < self.level:
+            return
+        event = (time.time(), level, message, args)
+        self.events.append(event)
+        self.recorded += 1
+        if self.echo:
+            self._write(event)
+
+    def debug(self, message: str, *args):
+        self.log(DEBUG, message, *args)
+
+    def info(self, message: str, *args):
+        self.log(INFO, message, *args)
+
+    def warning(self, message: str, *args):
+        self.log(WARNING, message, *args)
+
+    def error(self, message: str, *args):
+        self.log(ERROR, message, *args)
+
+    def clear(self):
+        self.events.clear()
+        self.recorded = 0
+
+    def dump(self, reason: str = ""):
+        """
+        Writes the buffered events to stderr, oldest first, and clears them.
+        """
+        if not self.echo:
+            dropped = self.recorded - len(self.events)
+            header = f"--- parser diagnostics{': ' + reason if reason else ''}"
+            if dropped:
+                header += f" ({dropped} earlier events dropped)"
+            print(header, file=sys.stderr)
+            for event in self.events:
+                self._write(event)
+        self.clear()
+
+    @staticmethod
+    def _write(event):
+        timestamp, level, message, args = event
+        if args:
+            try:
+                message = message % args
+            except (TypeError, ValueError):
+                message = f"{message} {args!r}"
+        clock = time.strftime("%H:%M:%S", time.localtime(timestamp))
+        print(f"{clock}.{int(timestamp % 1 * 1000):03d} {LEVEL_NAMES.get(level, level)} {message}", file=sys.stderr)
+
+
+# Shared by the parser modules; save_parser's CLI configures it
+DIAGNOSTICS = Diagnostics()
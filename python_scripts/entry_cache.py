@@ -0,0 +1,173 @@
+import collections
+import gc
+import hashlib
+import marshal
+import os
+import tempfile
+import uuid
+
+from diagnostics import DIAGNOSTICS
+
+
+class MapEntryMemo:
+    """
+    Decoded entries of one map from the previous parse of a world, keyed by a
+    hash of each entry's raw bytes. The walker fills `current` as it goes, so
+    after a parse it holds exactly the entries of the latest version.
+    """
+
+    def __init__(self, map_name: str, previous: dict):
+        self.map_name = map_name
+        self.previous = previous
+        self.current = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(entry_bytes) -> bytes:
+        return hashlib.blake2b(entry_bytes, digest_size=16).digest()
+
+    @property
+    def changed(self) -> bool:
+        # Identical entries share a digest, so hits can exceed the memo's size;
+        # without misses `current` is a subset of `previous`, and equal sizes mean equal sets
+        return self.misses > 0 or len(self.current) != len(self.previous)
+
+
+class EntryCache:
+    """
+    Per-world memo of decoded map entries for incremental re-parses.
+
+    A world is identified by its GVAS header plus the world's GUID; the header
+    alone is shared by every world saved by the same game build, so worlds
+    without a GUID are not memoized. Because entries are keyed by a hash of
+    their bytes, a memo from the wrong world (or an older upload) only costs
+    cache misses, never a wrong result. Memos are sized by their marshalled
+    bytes; the most recent worlds stay in memory up to `max_bytes`, and with a
+    directory they also persist as marshal files, bounded to `max_bytes` on disk.
+    """
+
+    SUFFIX = ".entries"
+
+    def __init__(self, directory=None, salt: str = "", max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.salt = salt
+        self.max_bytes = max_bytes
+        # world key -> (entries, marshalled size)
+        self._memory = collections.OrderedDict()
+        self._memory_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def world_key(self, header_bytes, world_id: str, variant: str = ""):
+        """
+        Memo key of a world, or None when `world_id` is not a GUID.
+        """
+        try:
+            guid = uuid.UUID(world_id).hex
+        except (TypeError, ValueError):
+            return None
+        digest = hashlib.sha256(self.salt.encode("utf-8"))
+        for part in (bytes(header_bytes), guid.encode("utf-8"), variant.encode("utf-8")):
+            digest.update(b"\0")
+            digest.update(part)
+        return digest.hexdigest()
+
+    def _path(self, world_key: str) -> str:
+        return os.path.join(self.directory, world_key + self.SUFFIX)
+
+    def get(self, world_key: str) -> dict:
+        """
+        Returns the entry memo of `world_key`, or an empty dict when there is none.
+        """
+        remembered = self._memory.get(world_key)
+        if remembered is not None:
+            self._memory.move_to_end(world_key)
+            return remembered[0]
+        if not self.directory:
+            return {}
+        path = self._path(world_key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Unmarshalling builds millions of small containers; cyclic GC passes
+            # over them make the load ~10x slower and cannot free anything
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                salt, entries = marshal.loads(data)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+            if salt != self.salt:
+                return {}
+            os.utime(path)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            DIAGNOSTICS.warning("EntryCache.get: dropping unreadable memo %s: %s", world_key, e)
+            self._remove(path)
+            return {}
+        self._remember(world_key, entries, len(data))
+        return entries
+
+    def put(self, world_key: str, entries: dict):
+        data = marshal.dumps((self.salt, entries))
+        if len(data) > self.max_bytes:
+            DIAGNOSTICS.info("EntryCache.put: memo of %d bytes exceeds the %d byte bound", len(data), self.max_bytes)
+            self._forget(world_key)
+            return
+        self._remember(world_key, entries, len(data))
+        if not self.directory:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(world_key))
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        self.evict()
+
+    def _remember(self, world_key: str, entries: dict, size: int):
+        self._forget(world_key)
+        self._memory[world_key] = (entries, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    def _forget(self, world_key: str):
+        remembered = self._memory.pop(world_key, None)
+        if remembered is not None:
+            self._memory_bytes -= remembered[1]
+
+    def evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(self.SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
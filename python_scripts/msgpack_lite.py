@@ -0,0 +1,102 @@
+import struct
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+_UINT8 = struct.Struct(">BB")
+_UINT16 = struct.Struct(">BH")
+_UINT32 = struct.Struct(">BI")
+_UINT64 = struct.Struct(">BQ")
+_INT8 = struct.Struct(">Bb")
+_INT16 = struct.Struct(">Bh")
+_INT32 = struct.Struct(">Bi")
+_INT64 = struct.Struct(">Bq")
+_FLOAT64 = struct.Struct(">Bd")
+
+
+def packb(obj, default=None) -> bytes:
+    """
+    Serializes `obj` as MessagePack.
+
+    Uses the msgpack package when it is installed and otherwise falls back to a
+    small pure-Python encoder covering None, bool, int, float, str, bytes, lists
+    and dicts. `default` converts any other object, like JSONEncoder.default.
+    """
+    if msgpack is not None:
+        return msgpack.packb(obj, default=default, use_bin_type=True)
+    out = bytearray()
+    _pack(obj, out, default)
+    return bytes(out)
+
+
+def _pack_length(out, length, fix_tag, fix_limit, tag16, tag32, tag8=None):
+    if length < fix_limit:
+        out.append(fix_tag | length)
+    elif tag8 is not None and length <= 0xFF:
+        out += _UINT8.pack(tag8, length)
+    elif length <= 0xFFFF:
+        out += _UINT16.pack(tag16, length)
+    else:
+        out += _UINT32.pack(tag32, length)
+
+
+def _pack(obj, out, default):
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -0x20 <= obj < 0:
+            out.append(obj & 0xFF)
+        elif obj >= 0:
+            if obj <= 0xFF:
+                out += _UINT8.pack(0xCC, obj)
+            elif obj <= 0xFFFF:
+                out += _UINT16.pack(0xCD, obj)
+            elif obj <= 0xFFFFFFFF:
+                out += _UINT32.pack(0xCE, obj)
+            else:
+                out += _UINT64.pack(0xCF, obj)
+        elif obj >= -0x80:
+            out += _INT8.pack(0xD0, obj)
+        elif obj >= -0x8000:
+            out += _INT16.pack(0xD1, obj)
+        elif obj >= -0x80000000:
+            out += _INT32.pack(0xD2, obj)
+        else:
+            out += _INT64.pack(0xD3, obj)
+    elif isinstance(obj, float):
+        out += _FLOAT64.pack(0xCB, obj)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        _pack_length(out, len(data), 0xA0, 32, 0xDA, 0xDB, tag8=0xD9)
+        out += data
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        data = bytes(obj)
+        if len(data) <= 0xFF:
+            out += _UINT8.pack(0xC4, len(data))
+        elif len(data) <= 0xFFFF:
+            out += _UINT16.pack(0xC5, len(data))
+        else:
+            out += _UINT32.pack(0xC6, len(data))
+        out += data
+    elif isinstance(obj, (list, tuple)):
+        _pack_length(out, len(obj), 0x90, 16, 0xDC, 0xDD)
+        for item in obj:
+            _pack(item, out, default)
+    elif isinstance(obj, dict):
+        _pack_length(out, len(obj), 0x80, 16, 0xDE, 0xDF)
+        for key, value in obj.items():
+            _pack(key, out, default)
+            _pack(value, out, default)
+    elif default is not None:
+        _pack(default(obj), out, default)
+    else:
+        raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+
+from diagnostics import DIAGNOSTICS
+
+
+class ParseCache:
+    """
+    Content-addressed on-disk cache of parse results.
+
+    Entries are keyed by SHA-256 of the uploaded save plus a parser-version salt,
+    stored as zlib-compressed JSON, and evicted least-recently-used first once the
+    directory grows past `max_bytes`. A hit's mtime is bumped so recency survives
+    across worker processes sharing the same directory.
+    """
+
+    SUFFIX = ".json.z"
+
+    def __init__(self, directory, salt: str, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.salt = salt.encode("utf-8")
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, file_content, variant: str = "") -> str:
+        """
+        Cache key for `file_content`; `variant` separates differently shaped
+        payloads derived from the same save.
+        """
+        digest = hashlib.sha256(self.salt)
+        digest.update(b"\0")
+        digest.update(variant.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(file_content)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str):
+        """
+        Returns the cached payload for `key`, or None on a miss or unreadable entry.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                payload = json.loads(zlib.decompress(f.read()))
+            os.utime(path)
+            return payload
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            DIAGNOSTICS.warning("ParseCache.get: dropping unreadable entry %s: %s", key, e)
+            self._remove(path)
+            return None
+
+    def put(self, key: str, payload, encoder=None):
+        """
+        Stores `payload` under `key`. The write goes through a temp file and
+        os.replace so concurrent readers never see a partial entry.
+        """
+        data = zlib.compress(json.dumps(payload, cls=encoder).encode("utf-8"), 6)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(self.SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
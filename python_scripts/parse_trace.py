@@ -0,0 +1,74 @@
+import contextlib
+import json
+import os
+import time
+
+
+class ParseTrace:
+    """
+    Structured record of one parse: timed phases with bytes in/out, plus counters.
+
+    Phases may nest. summary() is the JSON-able form returned to callers and
+    to_chrome_trace() renders the same data as trace-event JSON that opens in
+    chrome://tracing or Perfetto. `on_progress`, when set, receives each
+    milestone passed to progress() as {"stage", "done", "total"}.
+    """
+
+    def __init__(self, on_progress=None):
+        self.phases = []
+        self.counters = {}
+        self.on_progress = on_progress
+        self._origin = time.perf_counter_ns()
+
+    @contextlib.contextmanager
+    def phase(self, name: str, bytes_in: int = None):
+        """
+        Times the enclosed block. The yielded record can be updated inside the
+        block, e.g. record["bytes_out"] = len(result).
+        """
+        record = {"name": name, "start_us": 0.0, "duration_us": 0.0, "bytes_in": bytes_in, "bytes_out": None}
+        self.phases.append(record)
+        start = time.perf_counter_ns()
+        try:
+            yield record
+        finally:
+            end = time.perf_counter_ns()
+            record["start_us"] = (start - self._origin) / 1000
+            record["duration_us"] = (end - start) / 1000
+
+    def count(self, name: str, value):
+        self.counters[name] = value
+
+    def progress(self, stage: str, done: int = None, total: int = None):
+        if self.on_progress is not None:
+            self.on_progress({"stage": stage, "done": done, "total": total})
+
+    def summary(self) -> dict:
+        return {"phases": self.phases, "counters": self.counters}
+
+    def to_chrome_trace(self) -> dict:
+        pid = os.getpid()
+        events = []
+        for record in self.phases:
+            args = {key: record[key] for key in ("bytes_in", "bytes_out") if record[key] is not None}
+            events.append({
+                "name": record["name"],
+                "cat": "parse",
+                "ph": "X",
+                "ts": record["start_us"],
+                "dur": record["duration_us"],
+                "pid": pid,
+                "tid": 0,
+                "args": args,
+            })
+        end_us = max((r["start_us"] + r["duration_us"] for r in self.phases), default=0.0)
+        for name, value in self.counters.items():
+            if isinstance(value, dict):
+                events.append({"name": name, "ph": "C", "ts": end_us, "pid": pid, "args": value})
+            elif isinstance(value, (int, float)):
+                events.append({"name": name, "ph": "C", "ts": end_us, "pid": pid, "args": {name: value}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"counters": self.counters}}
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
@@ -0,0 +1,84 @@
+"""
+Side-effect-free core helpers for the parser scripts.
+
+Importing anything from palworld_pal_editor runs its package __init__, which
+builds the editor's Logger (creating a logs/ directory and a log file), loads
+its JSON data tables and imports Flask. The parser only needs the property
+accessors and UUID helpers below, which mirror the editor's pal_objects for
+the parser's decoded values, and reads editor data files straight from the
+package directory without importing it.
+"""
+
+import importlib.util
+import json
+import os
+import uuid
+
+
+EMPTY_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+def get_nested_attr(container, keys):
+    """
+    Returns the value at the end of the `keys` path, or None if any key is missing.
+    """
+    current_level = container
+    for key in keys:
+        try:
+            current_level = current_level[key]
+        except Exception:
+            return None
+    return current_level
+
+
+class PalObjects:
+    """
+    The editor's PalObjects property accessors.
+    """
+
+    @staticmethod
+    def get_BaseType(container):
+        return get_nested_attr(container, ("value",))
+
+    @staticmethod
+    def get_ByteProperty(container):
+        return get_nested_attr(container, ("value", "value"))
+
+
+def toUUID(value):
+    """
+    Parses a GUID as decoded by GvasReader (32 hex digits) or in dashed form; None if it isn't one.
+    """
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def UUID2HexStr(value) -> str:
+    return str(value).upper().replace("-", "")
+
+
+def is_empty_uuid(value) -> bool:
+    """
+    True for a missing GUID or the all-zero one, in either form.
+    """
+    return value is None or not str(value).replace("-", "").strip("0")
+
+
+def editor_data_path(filename: str) -> str:
+    # find_spec locates the package without running its __init__
+    spec = importlib.util.find_spec("palworld_pal_editor")
+    if spec is None or not spec.submodule_search_locations:
+        raise ModuleNotFoundError("palworld_pal_editor is not on the path")
+    return os.path.join(next(iter(spec.submodule_search_locations)), "assets", "data", filename)
+
+
+def load_editor_data(filename: str):
+    """
+    Loads one of the editor's assets/data JSON tables, as its data_provider does.
+    """
+    with open(editor_data_path(filename), "r", encoding="utf8") as f:
+        return json.load(f)
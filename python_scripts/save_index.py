@@ -0,0 +1,262 @@
+"""
+Persistent offset index for point lookups into a Level.sav.
+
+write_save_index decompresses the save once and writes two sidecars next to
+it: the decompressed GVAS (<save>.gvas) and a JSON index (<save>.gvas.idx)
+mapping top-level property paths, CharacterSaveParameterMap entries (by
+InstanceId, with players also by PlayerUId) and GroupSaveDataMap entries (by
+group id) to byte ranges in it. SaveIndex answers a lookup by reading and
+decoding only that range.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from save_core import PalObjects, is_empty_uuid
+from save_parser import (
+    PARSER_VERSION,
+    GvasReader,
+    decompress_gvas,
+    iter_property_ranges,
+    parse_gvas_header,
+    parse_gvas_properties,
+    read_file,
+    skip_gvas_properties,
+)
+
+
+INDEX_VERSION = 2
+GVAS_SUFFIX = ".gvas"
+INDEX_SUFFIX = ".gvas.idx"
+WORLD_PROPERTY = "worldSaveData"
+CHARACTER_MAP = "CharacterSaveParameterMap"
+GROUP_MAP = "GroupSaveDataMap"
+
+
+def source_fingerprint(file_path) -> dict:
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "parser_version": PARSER_VERSION}
+
+
+def index_map_entries(reader: GvasReader, value_start: int):
+    """
+    Yields (key, start, size) for each entry of the map whose value starts at
+    `value_start`. Keys are decoded (they are a couple of small properties),
+    values are skipped.
+    """
+    reader.offset = value_start
+    key_type = reader.fstring()
+    reader.fstring()
+    count = reader.int32()
+    for _ in range(count):
+        start = reader.offset
+        if key_type == "StructProperty":
+            key = parse_gvas_properties(reader)
+        else:
+            key = reader.fstring()
+        skip_gvas_properties(reader)
+        yield key, start, reader.offset - start
+
+
+def build_save_index(data) -> dict:
+    """
+    Scans a decompressed GVAS buffer into the index structure written by
+    write_save_index.
+    """
+    reader = GvasReader(data)
+    parse_gvas_header(reader)
+    properties = {}
+    maps = {}
+    characters = {}
+    players = {}
+    groups = {}
+
+    for name, property_type, start, value_start, end in iter_property_ranges(reader):
+        properties[f".{name}"] = [start, end - start]
+        if name != WORLD_PROPERTY or property_type != "StructProperty":
+            continue
+        reader.offset = value_start
+        reader.fstring()
+        reader.guid()
+        for child, child_type, child_start, child_value_start, child_end in iter_property_ranges(reader):
+            properties[f".{name}.{child}"] = [child_start, child_end - child_start]
+            if child_type != "MapProperty" or child not in (CHARACTER_MAP, GROUP_MAP):
+                continue
+            reader.offset = child_value_start
+            maps[child] = {"key_type": reader.fstring(), "value_type": reader.fstring()}
+            for key, entry_start, entry_size in index_map_entries(reader, child_value_start):
+                if child == GROUP_MAP:
+                    groups[str(key)] = [entry_start, entry_size]
+                    continue
+                instance_id = str(PalObjects.get_BaseType(key.get("InstanceId", {})))
+                characters[instance_id] = [entry_start, entry_size]
+                player_uid = PalObjects.get_BaseType(key.get("PlayerUId", {}))
+                if not is_empty_uuid(player_uid):
+                    players[str(player_uid)] = instance_id
+            reader.offset = child_end
+        reader.offset = end
+
+    return {
+        "version": INDEX_VERSION,
+        "gvas_size": len(data),
+        "properties": properties,
+        "maps": maps,
+        "characters": characters,
+        "players": players,
+        "groups": groups,
+    }
+
+
+def _write_atomic(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_save_index(file_path, file_content=None) -> dict:
+    """
+    Writes the <save>.gvas and <save>.gvas.idx sidecars for `file_path` and
+    returns the index. The GVAS goes first so an index never points past it.
+    """
+    if file_content is None:
+        file_content = read_file(file_path, text=False)
+    data, _ = decompress_gvas(file_content, file_path)
+    index = build_save_index(data)
+    index["source"] = source_fingerprint(file_path)
+    _write_atomic(file_path + GVAS_SUFFIX, lambda f: f.write(data))
+    _write_atomic(file_path + INDEX_SUFFIX, lambda f: f.write(json.dumps(index).encode("utf-8")))
+    return index
+
+
+class SaveIndex:
+    """
+    Point lookups into an indexed save. Each lookup is one pread of the entry's
+    byte range from the GVAS sidecar plus decoding that entry alone.
+    """
+
+    def __init__(self, gvas_path, index: dict):
+        self.index = index
+        self._fd = os.open(gvas_path, os.O_RDONLY)
+
+    @classmethod
+    def open(cls, file_path, build: bool = True):
+        """
+        Opens the sidecars of `file_path`. A missing or stale index (the save's
+        size or mtime changed, or a different parser version) is rebuilt when
+        `build` is set and otherwise returns None.
+        """
+        index = None
+        try:
+            with open(file_path + INDEX_SUFFIX, "rb") as f:
+                index = json.loads(f.read())
+            if (
+                index.get("version") != INDEX_VERSION
+                or index.get("source") != source_fingerprint(file_path)
+                or os.path.getsize(file_path + GVAS_SUFFIX) != index.get("gvas_size")
+            ):
+                index = None
+        except (FileNotFoundError, ValueError):
+            index = None
+        if index is None:
+            if not build:
+                return None
+            index = write_save_index(file_path)
+        return cls(file_path + GVAS_SUFFIX, index)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _reader(self, span) -> GvasReader:
+        offset, size = span
+        return GvasReader(os.pread(self._fd, size, offset))
+
+    def _map_entry(self, map_name: str, span) -> dict:
+        reader = self._reader(span)
+        if self.index["maps"][map_name]["key_type"] == "StructProperty":
+            key = parse_gvas_properties(reader)
+        else:
+            key = reader.fstring()
+        return {"key": key, "value": parse_gvas_properties(reader)}
+
+    def property(self, path: str):
+        """
+        Decodes one indexed property, e.g. ".worldSaveData.GroupSaveDataMap".
+        """
+        span = self.index["properties"].get(path)
+        if span is None:
+            return None
+        return next(iter(parse_gvas_properties(self._reader(span)).values()), None)
+
+    def character(self, instance_id: str):
+        span = self.index["characters"].get(instance_id)
+        return self._map_entry(CHARACTER_MAP, span) if span else None
+
+    def player(self, player_uid: str):
+        instance_id = self.index["players"].get(player_uid)
+        return self.character(instance_id) if instance_id else None
+
+    def group(self, group_id: str):
+        span = self.index["groups"].get(group_id)
+        return self._map_entry(GROUP_MAP, span) if span else None
+
+    def player_uids(self) -> list:
+        return list(self.index["players"])
+
+    def group_ids(self) -> list:
+        return list(self.index["groups"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Point lookups into a Level.sav through its offset index.")
+    parser.add_argument("file_path", help="Path to the Level.sav file.")
+    parser.add_argument("--rebuild", action="store_true", help="Rewrite the sidecars even if they are current.")
+    lookup = parser.add_mutually_exclusive_group()
+    lookup.add_argument("--character", help="Decode the character entry with this InstanceId.")
+    lookup.add_argument("--player", help="Decode the player character entry with this PlayerUId.")
+    lookup.add_argument("--group", help="Decode the group entry with this group id.")
+    lookup.add_argument("--property", help="Decode the property at this path, e.g. .worldSaveData.GroupSaveDataMap.")
+    lookup.add_argument("--list", choices=("players", "groups", "properties"), help="List the indexed keys.")
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        write_save_index(args.file_path)
+    with SaveIndex.open(args.file_path) as index:
+        if args.character:
+            result = index.character(args.character)
+        elif args.player:
+            result = index.player(args.player)
+        elif args.group:
+            result = index.group(args.group)
+        elif args.property:
+            result = index.property(args.property)
+        elif args.list == "players":
+            result = index.player_uids()
+        elif args.list == "groups":
+            result = index.group_ids()
+        elif args.list == "properties":
+            result = index.index["properties"]
+        else:
+            result = {name: len(index.index[name]) for name in ("properties", "characters", "players", "groups")}
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
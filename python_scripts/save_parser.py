@@ -1,20 +1,59 @@
+import argparse
 import json
 from json import JSONEncoder
 
-import copy
-import uuid
-from palworld_pal_editor.core.pal_objects import PalObjects
 import sys
 import os
+import mmap
+import tempfile
 import zlib
 import struct
 from collections import defaultdict
-from palworld_save_tools.raw_data import PALWORLD_CUSTOM_PROPERTIES
-
-
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import msgpack_lite
+from diagnostics import DEBUG, DIAGNOSTICS, LEVELS
+from entry_cache import EntryCache, MapEntryMemo
+from parse_cache import ParseCache
+from parse_trace import ParseTrace
+from save_core import PalObjects, is_empty_uuid
+
+
+# Salt for ParseCache keys. Bump whenever parse_save_file's output changes.
+PARSER_VERSION = "2"
+
+
+# World data the breeder never reads. Same list SaveManager skips in the editor.
+MAIN_SKIP_PROPERTIES = frozenset(
+    (
+        ".worldSaveData.MapObjectSaveData",
+        ".worldSaveData.FoliageGridSaveDataMap",
+        ".worldSaveData.MapObjectSpawnerInStageSaveData",
+        ".worldSaveData.DynamicItemSaveData",
+        ".worldSaveData.ItemContainerSaveData",
+        ".worldSaveData.WorkSaveData",
+        ".worldSaveData.DungeonSaveData",
+        ".worldSaveData.EnemyCampSaveData",
+        ".worldSaveData.CharacterParameterStorageSaveData",
+        ".worldSaveData.InvaderSaveData",
+        ".worldSaveData.DungeonPointMarkerSaveData",
+        ".worldSaveData.GameTimeSaveData",
+        ".worldSaveData.OilrigSaveData",
+        ".worldSaveData.SupplySaveData",
+        ".worldSaveData.RandomizerSaveData",
+        ".worldSaveData.GuildExtraSaveDataMap",
+    )
+)
 
-MAIN_SKIP_PROPERTIES = copy.deepcopy(PALWORLD_CUSTOM_PROPERTIES)
-MAIN_SKIP_PROPERTIES.add("Pal.SaveParameter")
+# The only subtrees parse_guild_data and load_character_save_parameter_map touch.
+BREEDER_INCLUDE_PATHS = frozenset(
+    (
+        ".worldSaveData.CharacterSaveParameterMap",
+        ".worldSaveData.GroupSaveDataMap",
+    )
+)
 
 
 def load_character_save_parameter_map(properties):
@@ -28,24 +67,25 @@ def load_character_save_parameter_map(properties):
     player_info = []
     working_pal_info = []
     dangling_pal_info = []
+    pals_by_owner = defaultdict(list)  # Owned pals as Pal rows by OwnerPlayerUId
 
     character_save_parameter_map = properties.get(
         "worldSaveData", {}
     ).get("value", {}).get("CharacterSaveParameterMap", {}).get("value", [])
 
     if not character_save_parameter_map:
-        print("load_character_save_parameter_map: No CharacterSaveParameterMap found")
-        return [], [], []
+        DIAGNOSTICS.warning("load_character_save_parameter_map: No CharacterSaveParameterMap found")
+        return [], [], [], {}
 
+    log = DIAGNOSTICS
+    debug = log.enabled(DEBUG)
     for pal_obj in character_save_parameter_map:
 
         key = pal_obj.get("key")
         value = pal_obj.get("value")
 
         if not key or not value:
-            print(
-                "load_character_save_parameter_map: Skipping pal as the key or value is missing"
-            )
+            log.warning("load_character_save_parameter_map: Skipping pal as the key or value is missing")
             continue
         
         character_type = PalObjects.get_BaseType(
@@ -55,12 +95,13 @@ def load_character_save_parameter_map(properties):
         if character_type == "EPalCharacterType::Player":
             player_uid = PalObjects.get_BaseType(key.get("PlayerUId", {}))
             if player_uid is None:
-                print("load_character_save_parameter_map: player_uid is none, skipping")
+                log.warning("load_character_save_parameter_map: player_uid is none, skipping")
                 continue
 
             player_mapping[str(player_uid)] = value  # Store player data
             player_info.append(player_uid)  # Append player_uid for tracking
-            print(f"load_character_save_parameter_map: Added player {player_uid} to player mapping")
+            if debug:
+                log.debug("load_character_save_parameter_map: Added player %s to player mapping", player_uid)
 
         elif character_type != "EPalCharacterType::Player" and character_type is not None:
             instance_id = PalObjects.get_BaseType(key.get("InstanceId", {}))  # Pal Instance ID
@@ -68,29 +109,39 @@ def load_character_save_parameter_map(properties):
                 value.get("RawData", {}).get("value", {}).get("OwnerPlayerUId", {})
             )  # Pal Owner
             
-            if owner_player_uid is None or str(owner_player_uid) == str(uuid.UUID(int=0)):  # No Owner
+            if is_empty_uuid(owner_player_uid):  # No Owner
                 dangling_pals[str(instance_id)] = value
-                print(f"load_character_save_parameter_map: Added pal {instance_id} to dangling pals")
+                if debug:
+                    log.debug("load_character_save_parameter_map: Added pal %s to dangling pals", instance_id)
 
                 dangling_pal_info.append(instance_id)
             else:
                 baseworker_mapping[str(instance_id)] = value
-                print(f"Added pal {instance_id} to baseworker mapping")
+                if debug:
+                    log.debug("load_character_save_parameter_map: Added pal %s to baseworker mapping", instance_id)
                 working_pal_info.append(instance_id)
+                raw_data = value.get("RawData", {}).get("value", {})
+                pals_by_owner[str(owner_player_uid)].append(
+                    Pal(
+                        id=str(instance_id),
+                        name=str(PalObjects.get_BaseType(raw_data.get("CharacterID", {}))),
+                        level=PalObjects.get_BaseType(raw_data.get("Level", {})) or 1,
+                        passives=PalObjects.get_BaseType(raw_data.get("PassiveSkillList", {})) or [],
+                        owner=str(owner_player_uid),
+                        guildMember="",
+                    )
+                )
         else:
-            print(f"load_character_save_parameter_map: Invalid character_type {character_type}")
+            log.warning("load_character_save_parameter_map: Invalid character_type %s", character_type)
             continue
 
-    return player_info, working_pal_info, dangling_pal_info
-
-MAIN_SKIP_PROPERTIES.add("Pal.CharacterSaveParameterMap")
-
+    return player_info, working_pal_info, dangling_pal_info, pals_by_owner
 
 def skip_decode(reader, type_name, size, path):
     """
     Skip decode
     Args:
-        reader: BytesIO
+        reader: GvasReader positioned right after the property size field
         type_name: Type of the property
         size: size of the property
         path: Location of the property
@@ -98,8 +149,9 @@ def skip_decode(reader, type_name, size, path):
     Returns:
         None
     """
-    print(f"Skipping {type_name} of size {size} at {path}")
-    reader.seek(size, 1)
+    DIAGNOSTICS.debug("Skipping %s of size %s at %s", type_name, size, path)
+    reader.skipped_bytes += size
+    reader.skip(size)
 
 
 def skip_encode(writer, property_type, properties):
@@ -120,6 +172,18 @@ def skip_encode(writer, property_type, properties):
     return
 
 
+def map_file(file_path):
+    """
+    Maps a save read-only instead of reading it into memory. The mapping can be
+    passed anywhere read_file's bytes are accepted.
+    """
+    with open(file_path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        mapping.madvise(mmap.MADV_SEQUENTIAL)
+    return mapping
+
+
 def read_file(file_path, text = False):
     try:
         if not os.path.exists(file_path):
@@ -130,7 +194,6 @@ def read_file(file_path, text = False):
 
             return data
     except Exception as e:
-        print(e)
         raise Exception(f"Error in read_file: {e}") from e
 
 
@@ -139,6 +202,13 @@ class GuildDataEncoder(JSONEncoder):
         return o.__dict__
 
 
+class Guild:
+    def __init__(self, id: str, guildName: str, members: list):
+        self.id = id
+        self.guildName = guildName
+        self.members = members
+
+
 class GuildMember:
     def __init__(self, id: str, name: str, pals: list):
         self.id = id
@@ -158,52 +228,202 @@ class Pal:
         self.guildMember = guildMember
 
 
-def read_string(data: bytes, offset: int) -> tuple[str, int]:
-    try:
-        length = struct.unpack("<I", data[offset : offset + 4])[0]
-        offset += 4
-        if length == 0:
-            return "", offset
-        is_utf16 = length < 0
-        text_length = abs(length)
-        if text_length > 0 and not is_utf16:
-            offset += 4
-        if offset + text_length > len(data):
-            raise ValueError("String read would exceed buffer bounds")
-        if is_utf16:
-            string: str = data[offset : offset + text_length].decode(
+ROSTER_LAYOUTS = ("objects", "columnar")
+
+
+def build_columnar_roster(guilds: list) -> dict:
+    """
+    Columnar form of the guild rosters for large worlds.
+
+    Species, passive and owner strings are interned into tables and every pal is
+    one row across parallel integer arrays; pal i's passives are
+    passiveIds[passiveOffsets[i]:passiveOffsets[i + 1]]. Guild members are owner indices.
+    """
+    species = {}
+    passives = {}
+    owners = {}
+    owner_names = []
+    guild_rows = []
+    pal_ids = []
+    levels = []
+    species_ids = []
+    owner_ids = []
+    passive_offsets = [0]
+    passive_ids = []
+
+    for guild in guilds:
+        member_ids = []
+        for member in guild.members:
+            owner_id = owners.setdefault(member.id, len(owners))
+            if owner_id == len(owner_names):
+                owner_names.append(member.name)
+            member_ids.append(owner_id)
+            for pal in member.pals:
+                pal_ids.append(pal.id)
+                levels.append(pal.level)
+                species_ids.append(species.setdefault(pal.name, len(species)))
+                owner_ids.append(owner_id)
+                passive_ids.extend(passives.setdefault(name, len(passives)) for name in pal.passives)
+                passive_offsets.append(len(passive_ids))
+        guild_rows.append({"id": guild.id, "guildName": guild.guildName, "members": member_ids})
+
+    return {
+        "layout": "columnar",
+        "species": list(species),
+        "passives": list(passives),
+        "owners": list(owners),
+        "ownerNames": owner_names,
+        "guilds": guild_rows,
+        "pals": {
+            "id": pal_ids,
+            "level": levels,
+            "species": species_ids,
+            "owner": owner_ids,
+            "passiveOffsets": passive_offsets,
+            "passiveIds": passive_ids,
+        },
+    }
+
+
+class GvasReader:
+    """
+    Cursor over a decompressed GVAS buffer.
+
+    All reads go through a single memoryview with precompiled struct codecs,
+    so walking the property tree only allocates the decoded values instead of
+    a bytes slice for every length prefix, int and GUID. The walker also keeps
+    per-type property counts and the number of bytes skipped on the reader, and
+    reports map decoding to `progress(map_name, done, total)` when it is set.
+    `entry_memo` lets the walker reuse unchanged entries of one map and
+    `decoder` hands a large map's entries to a ParallelDecoder. With `lazy` set,
+    property lists below the top level become LazyProperties instead of dicts.
+    Over an mmap, release_consumed() drops already-walked pages from the
+    process's RSS.
+    """
+
+    __slots__ = (
+        "data",
+        "offset",
+        "size",
+        "property_counts",
+        "skipped_bytes",
+        "progress",
+        "entry_memo",
+        "decoder",
+        "lazy",
+        "mapping",
+        "released",
+    )
 
-                "utf-16le", errors="ignore"
-            ).rstrip("\000")
+    HEADER = struct.Struct("<4sIIHHH2xII")
+    INT32 = struct.Struct("<i")
+    UINT32 = struct.Struct("<I")
+    UINT64 = struct.Struct("<Q")
+    FLOAT = struct.Struct("<f")
+
+    def __init__(self, data, offset: int = 0):
+        self.data = memoryview(data)
+        self.offset = offset
+        self.size = len(self.data)
+        self.property_counts = defaultdict(int)
+        self.skipped_bytes = 0
+        self.progress = None
+        self.entry_memo = None
+        self.decoder = None
+        self.lazy = False
+        self.mapping = data if isinstance(data, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED") else None
+        self.released = 0
+
+    def eof(self) -> bool:
+        return self.offset >= self.size
+
+    def skip(self, size: int):
+        self.offset += size
+
+    def release_consumed(self):
+        # The walker only moves forward; a page touched again just faults back in from the file
+        end = self.offset - self.offset % mmap.PAGESIZE
+        if self.mapping is not None and end > self.released:
+            self.mapping.madvise(mmap.MADV_DONTNEED, self.released, end - self.released)
+            self.released = end
+
+    def int32(self) -> int:
+        value = self.INT32.unpack_from(self.data, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def uint32(self) -> int:
+        value = self.UINT32.unpack_from(self.data, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def uint64(self) -> int:
+        value = self.UINT64.unpack_from(self.data, self.offset)[0]
+        self.offset += 8
+        return value
+
+    def float(self) -> float:
+        value = self.FLOAT.unpack_from(self.data, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def bool(self) -> bool:
+        value = self.data[self.offset] != 0
+        self.offset += 1
+        return value
+
+    def fstring(self) -> str:
+        """
+        Reads an Unreal FString: int32 length including the null terminator,
+        negative lengths are counted in UTF-16LE code units.
+        """
+        length = self.INT32.unpack_from(self.data, self.offset)[0]
+        offset = self.offset + 4
+        if length == 0:
+            self.offset = offset
+            return ""
+        if length < 0:
+            end = offset - length * 2
+            encoding = "utf-16le"
         else:
-            string = data[offset : offset + text_length].decode("utf-8", errors="ignore").rstrip("\000")
-        return string, offset + text_length
-    except Exception as e:
-        raise Exception(f"Error in read_string: {e}")
+            end = offset + length
+            encoding = "utf-8"
+        if end > self.size:
+            raise ValueError("String read would exceed buffer bounds")
+        self.offset = end
+        return str(self.data[offset:end], encoding, "ignore").rstrip("\000")
 
+    def guid(self) -> str:
+        offset = self.offset
+        self.offset = offset + 16
+        return self.data[offset : offset + 16].hex()
 
-def read_guid(data, offset):
-    guid = data[offset : offset + 16].hex()
-    return guid, offset + 16
+    def header(self) -> tuple:
+        if self.size - self.offset < self.HEADER.size:
+            raise ValueError("Buffer too small for GVAS header")
+        value = self.HEADER.unpack_from(self.data, self.offset)
+        self.offset += self.HEADER.size
+        return value
 
 
-def parse_gvas_header(data):
+def parse_gvas_header(reader: GvasReader):
 
     try:
-        magic = struct.unpack("<I", data[0:4])[0]
-        magic_str = data[0:4].decode("latin-1")
+        (
+            magic,
+            version,
+            package_flags,
+            engine_version_major,
+            engine_version_minor,
+            engine_version_patch,
+            custom_version,
+            save_game_version,
+        ) = reader.header()
+        magic_str = magic.decode("latin-1")
         if magic_str != "GVAS":
 
             raise ValueError(f"Invalid GVAS header: {magic_str}")
 
-        version = struct.unpack("<I", data[4:8])[0]
-        package_flags = struct.unpack("<I", data[8:12])[0]
-        engine_version_major = struct.unpack("<H", data[12:14])[0]
-        engine_version_minor = struct.unpack("<H", data[14:16])[0]
-        engine_version_patch = struct.unpack("<H", data[16:18])[0]
-        custom_version = struct.unpack("<I", data[20:24])[0]
-        save_game_version = struct.unpack("<I", data[24:28])[0]
-
         return {
             "magic_str": magic_str,
             "version": version,
@@ -220,258 +440,1340 @@ def parse_gvas_header(data):
         raise Exception(f"Error in parse_gvas_header: {e}")
 
 
-def parse_gvas_properties(data, offset):
+SIZED_PROPERTY_TYPES = frozenset(
+    ("StrProperty", "ArrayProperty", "MapProperty", "StructProperty")
+)
+STRING_PROPERTY_TYPES = frozenset(("NameProperty", "StrProperty", "EnumProperty"))
+CONTAINER_PROPERTY_TYPES = frozenset(("ArrayProperty", "MapProperty", "StructProperty"))
+
+
+class PathSelection:
+    """
+    Declarative include/skip sets of property paths, e.g. ".worldSaveData.GroupSaveDataMap".
+
+    A container property is decoded when its path is in `include`, lies under an
+    included path, or is an ancestor of one; anything else, and anything in `skip`,
+    is jumped over by its declared size without being decoded.
+    `include=None` means everything that is not skipped.
+    """
+
+    __slots__ = ("include", "ancestors", "skip", "unfiltered")
+
+    def __init__(self, include=None, skip=()):
+        self.include = frozenset(include) if include is not None else None
+        self.skip = frozenset(skip)
+        ancestors = set()
+        for path in self.include or ():
+            parts = path.split(".")
+            for i in range(2, len(parts)):
+                ancestors.add(".".join(parts[:i]))
+        self.ancestors = frozenset(ancestors)
+        # Selection used below an included path. None lets the walker stop building paths.
+        if self.include is None:
+            self.unfiltered = self
+        else:
+            self.unfiltered = PathSelection(None, self.skip) if self.skip else None
+
+    def child(self, path: str):
+        """
+        Returns the selection to decode `path` with, or False if it should be skipped.
+        """
+        if path in self.skip:
+            return False
+        if self.include is None:
+            return self
+        if path in self.include:
+            return self.unfiltered
+        if path in self.ancestors:
+            return self
+        return False
+
+
+BREEDER_SELECTION = PathSelection(BREEDER_INCLUDE_PATHS, MAIN_SKIP_PROPERTIES)
+
+
+SKIP_SIZED = -1
+SKIP_STRING = -2
+# Property type FStrings as stored (with the null terminator) -> how skip_gvas_properties steps over the value
+SKIP_KINDS = {
+    **{name.encode("utf-8") + b"\0": SKIP_SIZED for name in SIZED_PROPERTY_TYPES},
+    **{name.encode("utf-8") + b"\0": SKIP_STRING for name in STRING_PROPERTY_TYPES if name not in SIZED_PROPERTY_TYPES},
+    b"IntProperty\0": 4,
+    b"Int64Property\0": 8,
+    b"FloatProperty\0": 4,
+    b"BoolProperty\0": 1,
+}
+
+
+def skip_gvas_properties(reader: GvasReader):
+    """
+    Advances past a property list without decoding it. Names and types are
+    compared as raw bytes, sized values are skipped by their byte count and
+    fixed-size scalars by their width. Raises ValueError on a type whose length
+    isn't known without decoding.
+    """
+    data = reader.data
+    unpack = GvasReader.INT32.unpack_from
+    offset = reader.offset
+    while True:
+        length = unpack(data, offset)[0]
+        offset += 4
+        if length == 0:
+            break
+        if length < 0:
+            offset -= length * 2
+        elif length == 5 and data[offset : offset + 4] == b"None":
+            offset += 5
+            break
+        else:
+            offset += length
+        length = unpack(data, offset)[0]
+        offset += 4
+        kind = SKIP_KINDS.get(bytes(data[offset : offset + length])) if length > 0 else None
+        if kind is None:
+            raise ValueError(f"Cannot skip property type at offset {offset}")
+        offset += length
+        if kind == SKIP_SIZED:
+            offset += 4 + unpack(data, offset)[0]
+        elif kind == SKIP_STRING:
+            length = unpack(data, offset)[0]
+            offset += 4 + (length if length >= 0 else -length * 2)
+        else:
+            offset += kind
+        if offset > reader.size:
+            raise ValueError("Skip would exceed buffer bounds")
+    reader.offset = offset
+
+
+def iter_property_ranges(reader: GvasReader):
+    """
+    Yields (name, type, start, value_start, end) for each property of the list
+    at the reader's position without decoding values. The reader is left at
+    `end` on every yield; a consumer that moves it must put it back.
+    """
+    while not reader.eof():
+        start = reader.offset
+        name = reader.fstring()
+        if not name or name == "None":
+            return
+        property_type = reader.fstring()
+        kind = SKIP_KINDS.get(property_type.encode("utf-8") + b"\0")
+        if kind is None:
+            raise ValueError(f"Cannot index property {name} of type {property_type}")
+        if kind == SKIP_SIZED:
+            size = reader.int32()
+            value_start = reader.offset
+            end = value_start + size
+        elif kind == SKIP_STRING:
+            value_start = reader.offset
+            reader.fstring()
+            end = reader.offset
+        else:
+            value_start = reader.offset
+            end = value_start + kind
+        reader.offset = end
+        yield name, property_type, start, value_start, end
+
+
+# Type FStrings as stored -> type name, for the types scan_property_spans can step over
+SKIP_TYPE_NAMES = {type_bytes: str(type_bytes[:-1], "utf-8") for type_bytes in SKIP_KINDS}
+
+
+def scan_property_spans(reader: GvasReader) -> dict:
+    """
+    Advances past a property list like skip_gvas_properties and returns
+    {name: (type, offset, size, value_offset)} for its properties, offsets
+    being absolute in the reader's buffer and value_offset pointing past the
+    name, type and any size field. Raises ValueError like skip_gvas_properties.
+    """
+    data = reader.data
+    unpack = GvasReader.INT32.unpack_from
+    offset = reader.offset
+    spans = {}
+    while True:
+        start = offset
+        length = unpack(data, offset)[0]
+        offset += 4
+        if length == 0:
+            break
+        if length < 0:
+            end = offset - length * 2
+            name = str(data[offset:end], "utf-16le", "ignore").rstrip("\000")
+        else:
+            end = offset + length
+            name = str(data[offset:end], "utf-8", "ignore").rstrip("\000")
+            if name == "None":
+                offset = end
+                break
+        offset = end
+        length = unpack(data, offset)[0]
+        offset += 4
+        type_bytes = bytes(data[offset : offset + length]) if length > 0 else b""
+        kind = SKIP_KINDS.get(type_bytes)
+        if kind is None:
+            raise ValueError(f"Cannot skip property type at offset {offset}")
+        offset += length
+        value_offset = offset
+        if kind == SKIP_SIZED:
+            value_offset += 4
+            offset = value_offset + unpack(data, offset)[0]
+        elif kind == SKIP_STRING:
+            length = unpack(data, offset)[0]
+            offset += 4 + (length if length >= 0 else -length * 2)
+        else:
+            offset += kind
+        if offset > reader.size:
+            raise ValueError("Skip would exceed buffer bounds")
+        spans[name] = (SKIP_TYPE_NAMES[type_bytes], start, offset - start, value_offset)
+    reader.offset = offset
+    return spans
+
+
+SCALAR_READERS = {
+    "IntProperty": GvasReader.int32,
+    "Int64Property": GvasReader.uint64,
+    "FloatProperty": GvasReader.float,
+    "BoolProperty": GvasReader.bool,
+    **{name: GvasReader.fstring for name in STRING_PROPERTY_TYPES},
+}
+
+
+class LazyProperties(Mapping):
+    """
+    A property list decoded on first access.
+
+    The node records where its list lives in the reader's buffer and, once
+    scanned, a (type, offset, size, value_offset) span per property. A property
+    is decoded from its span when it is first read, so a struct the caller
+    never opens costs no more than being stepped over. Decoded containers are
+    LazyProperties again, on a lazy reader. It reads like the dict
+    parse_gvas_properties would have returned, so PalObjects accessors index it
+    the same way; materialize() turns a tree into plain dicts.
+
+    Nodes share the reader that walked them, so the buffer must outlive the
+    tree. Reading a node narrows that reader to the node's span and restores
+    its offset and size afterwards, so nodes can be read from anywhere,
+    interleaved with each other or with a walk on the same reader.
+    """
+
+    __slots__ = ("reader", "offset", "size", "path", "selection", "_spans", "_selected", "_values")
+
+    def __init__(
+        self,
+        reader: GvasReader,
+        offset: int,
+        size: int,
+        path: str = "",
+        selection: PathSelection = None,
+        spans: dict = None,
+    ):
+        self.reader = reader
+        self.offset = offset
+        self.size = size
+        self.path = path
+        self.selection = selection
+        self._spans = spans
+        self._selected = selection is None
+        self._values = {}
+
+    def spans(self) -> dict:
+        """
+        Returns {name: (type, offset, size, value_offset)} for the properties of this list.
+        """
+        if self._spans is None:
+            reader = self.reader
+            saved_offset, saved_size = reader.offset, reader.size
+            reader.offset = self.offset
+            reader.size = self.offset + self.size
+            try:
+                self._spans = scan_property_spans(reader)
+            except ValueError:
+                # A type the scanner can't size: decode the whole list the regular way
+                reader.offset = self.offset
+                self._values = parse_gvas_properties(reader, self.path, self.selection)
+                self._spans = {name: (value.get("type"), None, None, None) for name, value in self._values.items()}
+                self._selected = True
+            finally:
+                reader.offset, reader.size = saved_offset, saved_size
+        if not self._selected:
+            # Drop what the selection skips, so the node has the eager tree's keys
+            self._spans = {
+                name: span
+                for name, span in self._spans.items()
+                if span[0] not in CONTAINER_PROPERTY_TYPES or self.selection.child(f"{self.path}.{name}") is not False
+            }
+            self._selected = True
+        return self._spans
+
+    def __getitem__(self, name: str):
+        value = self._values.get(name)
+        if value is not None:
+            return value
+        spans = self._spans
+        if spans is None or not self._selected:
+            spans = self.spans()
+        reader = self.reader
+        saved_offset, saved_size = reader.offset, reader.size
+        try:
+            value = self._decode(name, *spans[name])
+        finally:
+            reader.offset, reader.size = saved_offset, saved_size
+        self._values[name] = value
+        return value
+
+    def _decode(self, name: str, property_type: str, offset: int, size: int, value_offset: int):
+        reader = self.reader
+        reader.size = offset + size
+        reader.offset = value_offset
+        # Scalars, structs and scalar arrays straight from the span; the rest goes through the walker
+        read_scalar = SCALAR_READERS.get(property_type)
+        if read_scalar is not None:
+            value = {"type": property_type, "value": read_scalar(reader)}
+        elif property_type == "StructProperty":
+            struct_type = reader.fstring()
+            struct_guid = reader.guid()
+            path = self.path
+            selection = self.selection
+            if selection is not None:
+                path = f"{path}.{name}"
+                selection = selection.child(path)
+            value = {
+                "type": property_type,
+                "struct_type": struct_type,
+                "struct_id": struct_guid,
+                "value": LazyProperties(reader, reader.offset, offset + size - reader.offset, path, selection),
+            }
+        elif property_type == "ArrayProperty" and (items := read_scalar_array(reader)) is not None:
+            value = {"type": property_type, "value": items}
+        else:
+            reader.offset = offset
+            return parse_gvas_properties(reader, self.path, self.selection)[name]
+        reader.property_counts[property_type] += 1
+        return value
+
+    def get(self, name: str, default=None):
+        # Mapping.get through __getitem__, minus a frame on the hot path
+        value = self._values.get(name)
+        if value is not None:
+            return value
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        return iter(self.spans())
+
+    def __len__(self) -> int:
+        return len(self.spans())
+
+    def __repr__(self) -> str:
+        return f"LazyProperties(offset={self.offset}, size={self.size}, path={self.path!r})"
+
+
+def read_scalar_array(reader: GvasReader):
+    """
+    Reads an ArrayProperty value of names, strings or ints at the reader's
+    position into a list. Returns None, leaving the cursor moved, for any
+    other element type.
+    """
+    array_type = reader.fstring()
+    if array_type in STRING_PROPERTY_TYPES:
+        read = reader.fstring
+    elif array_type == "IntProperty":
+        read = reader.int32
+    else:
+        return None
+    return [read() for _ in range(reader.int32())]
+
+
+def materialize(value):
+    """
+    Copies a (partly) lazy property tree into plain dicts and lists.
+    """
+    if isinstance(value, Mapping):
+        return {key: materialize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [materialize(item) for item in value]
+    return value
+
+
+def read_lazy_properties(reader: GvasReader, path: str, selection):
+    """
+    Steps over the property list at the reader's position and returns it as a
+    LazyProperties node, or decodes it eagerly if it holds a type the scanner
+    can't size.
+    """
+    start = reader.offset
+    try:
+        spans = scan_property_spans(reader)
+    except ValueError:
+        reader.offset = start
+        return parse_gvas_properties(reader, path, selection)
+    return LazyProperties(reader, start, reader.offset - start, path, selection, spans)
+
+
+def read_map_entry(reader: GvasReader, key_type: str, key_path: str, value_path: str, selection):
+    read_properties = read_lazy_properties if reader.lazy else parse_gvas_properties
+    if key_type == "StructProperty":
+        key = read_properties(reader, key_path, selection)
+    else:
+        key = reader.fstring()
+    return {"key": key, "value": read_properties(reader, value_path, selection)}
+
+
+def parse_gvas_properties(reader: GvasReader, path: str = "", selection: PathSelection = None):
+    """
+    Walks a property list until its "None" terminator.
+
+    Sized properties store an int32 byte count covering everything after the size
+    field, which is what lets `selection` skip unwanted subtrees in O(1).
+    Struct fields sit directly under the property's "value" (the palworld_save_tools
+    shape PalObjects accessors expect), arrays of names/strings/ints decode to a plain
+    list and any other array to a list of property lists,
+    map entries to a list of {"key", "value"} dicts; struct keys are decoded as
+    property lists, any other key type as a string. On a `lazy` reader every
+    nested property list is a LazyProperties node instead.
+    """
 
     properties = {}
 
-    while offset < len(data):
+    while not reader.eof():
 
         try:
-            property_name, offset = read_string(data, offset)
+            property_name = reader.fstring()
             if not property_name or property_name == "None":
                 break
 
-            property_type, offset = read_string(data, offset)
+            property_type = reader.fstring()
         except Exception as e :
-            print("failed to read string, skipping")
-
-
-            continue
+            DIAGNOSTICS.error("parse_gvas_properties: failed to read string, stopping: %s", e)
+            break
+        reader.property_counts[property_type] += 1
         property_size = 0
-        if property_type in [
-            "StrProperty",
-            "ArrayProperty",
-            "MapProperty",
-            "StructProperty",
-        ]:
-            property_size = struct.unpack("<i", data[offset : offset + 4])[0]
-            print(f"property_size: {property_size}")
-
-            offset += 4
+        if property_type in SIZED_PROPERTY_TYPES:
+            property_size = reader.int32()
+        value_start = reader.offset
+
+        child_path = path
+        child_selection = None
+        if selection is not None and property_type in CONTAINER_PROPERTY_TYPES:
+            child_path = f"{path}.{property_name}"
+            child_selection = selection.child(child_path)
+            if child_selection is False:
+                skip_decode(reader, property_type, property_size, child_path)
+                continue
+
         value = None
         if property_type == "StructProperty":
             try:
-                struct_type, offset = read_string(data, offset)
-                struct_guid, offset = read_guid(data, offset)
-                value, offset = parse_gvas_properties(data, offset)
-                value = {"type": struct_type, "guid": struct_guid, "value": value}
+                struct_type = reader.fstring()
+                struct_guid = reader.guid()
+                if reader.lazy:
+                    value_end = value_start + property_size
+                    value = LazyProperties(reader, reader.offset, value_end - reader.offset, child_path, child_selection)
+                    reader.offset = value_end
+                else:
+                    value = parse_gvas_properties(reader, child_path, child_selection)
+                properties[property_name] = {
+                    "type": property_type,
+                    "struct_type": struct_type,
+                    "struct_id": struct_guid,
+                    "value": value,
+                }
+                continue
             except:
 
-                print(f"parse_gvas_properties: failed to read StructProperty, skipping {property_name}")
-                offset += property_size
+                DIAGNOSTICS.error("parse_gvas_properties: failed to read StructProperty, skipping %s", property_name)
+                reader.offset = value_start + property_size
                 continue
         elif property_type == "ArrayProperty":
             try:
-                array_type, offset = read_string(data, offset)
-                array_length = struct.unpack("<i", data[offset : offset + 4])[0]
-                offset += 4
-                value = []
-                for _ in range(array_length):
-                    item_value, offset = parse_gvas_properties(data, offset)
-                    value.append(item_value)
+                array_type = reader.fstring()
+                array_length = reader.int32()
+                if array_type in STRING_PROPERTY_TYPES:
+                    value = [reader.fstring() for _ in range(array_length)]
+                elif array_type == "IntProperty":
+                    value = [reader.int32() for _ in range(array_length)]
+                else:
+                    read_properties = read_lazy_properties if reader.lazy else parse_gvas_properties
+                    value = [
+                        read_properties(reader, child_path, child_selection)
+                        for _ in range(array_length)
+                    ]
             except:
 
-                print(f"parse_gvas_properties: failed to read ArrayProperty, skipping {property_name}")
-                offset += property_size
+                DIAGNOSTICS.error("parse_gvas_properties: failed to read ArrayProperty, skipping %s", property_name)
+                reader.offset = value_start + property_size
                 continue
         elif property_type == "MapProperty":
             try:
-                key_type, offset = read_string(data, offset)
-                value_type, offset = read_string(data, offset)
-                map_length = struct.unpack("<i", data[offset : offset + 4])[0]
-                offset += 4
-                value = {}
-                for _ in range(map_length):
-                    key, offset = read_string(data, offset)
-                    map_value, offset = parse_gvas_properties(data, offset)
-                    value[key] = map_value
+                key_type = reader.fstring()
+                value_type = reader.fstring()
+                map_length = reader.int32()
+                key_path = f"{child_path}.Key"
+                value_path = f"{child_path}.Value"
+                value = []
+                progress = reader.progress
+                progress_step = max(1, map_length // 100)
+                memo = reader.entry_memo
+                if memo is not None and (memo.map_name != property_name or reader.lazy):
+                    memo = None
+                decoder = reader.decoder
+                if decoder is not None and (
+                    decoder.map_name != property_name or map_length < decoder.min_entries or reader.lazy
+                ):
+                    decoder = None
+                # (position in value, start, end, digest) of entries left for the decoder
+                deferred = []
+                for index in range(map_length):
+                    if index % progress_step == 0:
+                        if progress is not None and decoder is None:
+                            progress(property_name, index, map_length)
+                        if reader.mapping is not None:
+                            reader.release_consumed()
+                    entry_start = reader.offset
+                    digest = None
+                    if memo is not None or decoder is not None:
+                        # Find the entry's bounds without decoding it
+                        if key_type == "StructProperty":
+                            skip_gvas_properties(reader)
+                        else:
+                            reader.fstring()
+                        skip_gvas_properties(reader)
+                        if memo is not None:
+                            # Hash the entry's bytes and only decode it if the last parse didn't see them
+                            digest = memo.digest(reader.data[entry_start : reader.offset])
+                            entry = memo.previous.get(digest)
+                            if entry is not None:
+                                memo.hits += 1
+                                memo.current[digest] = entry
+                                value.append(entry)
+                                continue
+                            memo.misses += 1
+                        if decoder is not None:
+                            deferred.append((len(value), entry_start, reader.offset, digest))
+                            value.append(None)
+                            continue
+                        reader.offset = entry_start
+                    entry = read_map_entry(reader, key_type, key_path, value_path, child_selection)
+                    if memo is not None:
+                        memo.current[digest] = entry
+                    value.append(entry)
+                if deferred:
+                    map_end = reader.offset
+                    hits = map_length - len(deferred)
+                    report = None
+                    if progress is not None:
+                        report = lambda done: progress(property_name, hits + done, map_length)
+                    entries = decoder.decode(
+                        reader, [(start, end) for _, start, end, _ in deferred],
+                        key_type, key_path, value_path, child_selection, report,
+                    )
+                    for (position, _, _, digest), entry in zip(deferred, entries):
+                        value[position] = entry
+                        if memo is not None:
+                            memo.current[digest] = entry
+                    reader.offset = map_end
+                if progress is not None:
+                    progress(property_name, map_length, map_length)
             except:
 
-                print(f"parse_gvas_properties: failed to read MapProperty, skipping {property_name}")
-                offset += property_size
+                DIAGNOSTICS.error("parse_gvas_properties: failed to read MapProperty, skipping %s", property_name)
+                reader.offset = value_start + property_size
                 continue
 
         elif property_type == "IntProperty":
-            value = struct.unpack("<i", data[offset : offset + 4])[0]
-            offset += 4
+            value = reader.int32()
 
         elif property_type == "Int64Property":
-            value = struct.unpack("<Q", data[offset : offset + 8])[0]
-            offset += 8
+            value = reader.uint64()
 
         elif property_type == "FloatProperty":
-            value = struct.unpack("<f", data[offset : offset + 4])[0]
-            offset += 4
+            value = reader.float()
 
         elif property_type == "BoolProperty":
-            value = data[offset] != 0
-            offset += 1
+            value = reader.bool()
 
-        elif property_type in ["NameProperty", "StrProperty", "EnumProperty",]:
+        elif property_type in STRING_PROPERTY_TYPES:
 
-            value, offset = read_string(data, offset)
+            value = reader.fstring()
         else:
-            print(f"parse_gvas_properties: Unknown property type: {property_type}")
+            DIAGNOSTICS.warning("parse_gvas_properties: Unknown property type: %s", property_type)
             if property_size > 0:
-                offset += property_size
+                reader.skip(property_size)
                 continue
 
         properties[property_name] = {"type": property_type, "value": value}
 
-    return properties, offset
+    return properties
 
 
-def try_decompress(data):
-    decompressed = zlib.decompress(data)
-    return decompressed
+def _init_decode_process():
+    # Pool processes must never write to the worker's frame stream
+    sys.stdout = sys.stderr
 
-    
-    
 
-    
-def decompress_gvas(data,file_path):
+def _decode_entry_chunk(shm_name: str, spans, key_type: str, key_path: str, value_path: str, selection):
+    # Pool processes share the parent's resource tracker, so attaching here
+    # doesn't add an owner; the parent alone unlinks the segment
+    shm = shared_memory.SharedMemory(name=shm_name)
+    reader = GvasReader(shm.buf)
+    try:
+        entries = []
+        for start, _ in spans:
+            reader.offset = start
+            entries.append(read_map_entry(reader, key_type, key_path, value_path, selection))
+        return entries, dict(reader.property_counts)
+    finally:
+        reader.data.release()
+        shm.close()
+
+
+class ParallelDecoder:
+    """
+    Decodes the entries of one large map across a process pool.
+
+    The walker finds each entry's byte range with a skip scan, then the ranges
+    are copied into one shared-memory segment that pool processes attach to by
+    name, so only the small span lists are pickled on the way in. Chunks come
+    back in submission order and are merged in order. Maps smaller than
+    `min_entries` are decoded in-process, where the fan-out wouldn't pay off.
+    """
+
+    CHUNKS_PER_PROCESS = 4
+
+    def __init__(self, processes: int, map_name: str = "CharacterSaveParameterMap", min_entries: int = 2048):
+        self.processes = processes
+        self.map_name = map_name
+        self.min_entries = min_entries
+        self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_decode_process)
+        return self._executor
+
+    def decode(self, reader: GvasReader, spans, key_type, key_path, value_path, selection, progress=None) -> list:
+        if len(spans) < self.min_entries:
+            entries = []
+            for start, _ in spans:
+                reader.offset = start
+                entries.append(read_map_entry(reader, key_type, key_path, value_path, selection))
+            if progress is not None:
+                progress(len(entries))
+            return entries
+
+        base = spans[0][0]
+        size = spans[-1][1] - base
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            shm.buf[:size] = reader.data[base : base + size]
+            chunk_size = -(-len(spans) // (self.processes * self.CHUNKS_PER_PROCESS))
+            pool = self._pool()
+            futures = [
+                pool.submit(
+                    _decode_entry_chunk,
+                    shm.name,
+                    [(start - base, end - base) for start, end in spans[i : i + chunk_size]],
+                    key_type,
+                    key_path,
+                    value_path,
+                    selection,
+                )
+                for i in range(0, len(spans), chunk_size)
+            ]
+            entries = []
+            for future in futures:
+                chunk_entries, property_counts = future.result()
+                entries.extend(chunk_entries)
+                for property_type, count in property_counts.items():
+                    reader.property_counts[property_type] += count
+                if progress is not None:
+                    progress(len(entries))
+            return entries
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+SAV_HEADER = struct.Struct("<III")
+SAV_MAGIC = 0x014B0622
+GVAS_MAGIC = b"GVAS"
+MAX_COMPRESSION_LAYERS = 4
+DOUBLE_COMPRESSED_MAGIC = 0x31
+# An inner zlib stream barely compresses again, so an outer layer inflates to
+# little more than its own size.
+OUTER_LAYER_GROWTH = 2
+DECOMPRESS_INPUT_CHUNK = 256 * 1024
+DECOMPRESS_OUTPUT_CHUNK = 1024 * 1024
+
+
+def stream_decompress(data, expected_size: int = 0) -> bytearray:
+    """
+    Inflates one zlib stream into a single buffer.
+
+    Input is fed in bounded slices and output is drained in bounded chunks, so
+    zlib's internal copies stay small; the output buffer is preallocated to
+    `expected_size` and trimmed to what was actually written.
+    Raises zlib.error if `data` is not zlib and ValueError if the stream is truncated.
+    """
+    decompressor = zlib.decompressobj()
+    view = memoryview(data)
+    out = bytearray(expected_size)
+    written = 0
+    for start in range(0, len(view), DECOMPRESS_INPUT_CHUNK):
+        pending = view[start : start + DECOMPRESS_INPUT_CHUNK]
+        while pending and not decompressor.eof:
+            chunk = decompressor.decompress(pending, DECOMPRESS_OUTPUT_CHUNK)
+            pending = decompressor.unconsumed_tail
+            end = written + len(chunk)
+            out[written:end] = chunk
+            written = end
+        if decompressor.eof:
+            break
+    if not decompressor.eof:
+        raise ValueError(f"Truncated zlib stream after {written} bytes")
+    del out[written:]
+    return out
+
+
+def stream_decompress_to_file(data, spill_dir: str) -> mmap.mmap:
+    """
+    Inflates one zlib stream into an anonymous temp file in `spill_dir` and maps
+    it, so the decompressed bytes live in the page cache rather than the heap.
+    Raises like stream_decompress.
+    """
+    decompressor = zlib.decompressobj()
+    view = memoryview(data)
+    written = 0
+    with tempfile.TemporaryFile(dir=spill_dir) as f:
+        for start in range(0, len(view), DECOMPRESS_INPUT_CHUNK):
+            pending = view[start : start + DECOMPRESS_INPUT_CHUNK]
+            while pending and not decompressor.eof:
+                chunk = decompressor.decompress(pending, DECOMPRESS_OUTPUT_CHUNK)
+                pending = decompressor.unconsumed_tail
+                f.write(chunk)
+                written += len(chunk)
+            if decompressor.eof:
+                break
+        if not decompressor.eof:
+            raise ValueError(f"Truncated zlib stream after {written} bytes")
+        if written == 0:
+            raise ValueError("Empty zlib stream")
+        f.flush()
+        # The mapping keeps the unlinked file alive after it is closed
+        return mmap.mmap(f.fileno(), written, access=mmap.ACCESS_READ)
+
+
+def decompress_gvas(data, file_path, spill_dir: str = None):
+    """
+    Strips the SAV header and zlib layers off a save and returns
+    (gvas_buffer, compression_count). With `spill_dir`, every layer is written
+    to a temp file there and mapped instead of held in memory.
+    """
 
     try:
-        magic = struct.unpack("<I", data[0:4])[0]
-        if magic != 0x014B0622:
+        magic, total_size, chunk_magic = SAV_HEADER.unpack_from(data, 0)
+        if magic != SAV_MAGIC:
             raise ValueError(f"Invalid save file magic: {hex(magic)}")
-        total_size = struct.unpack("<I", data[4:8])[0]
-        offset = 8
-        chunk_magic = struct.unpack("<I", data[offset : offset + 4])[0]
-        offset += 4
-        current_data = data[offset:]
+        current_data = memoryview(data)[SAV_HEADER.size :]
+        gvas_layer = 1 if chunk_magic == DOUBLE_COMPRESSED_MAGIC else 0
         compression_count = 0
-        while True:
-            decompressed = try_decompress(current_data)
-
-            if not decompressed:
+        while compression_count < MAX_COMPRESSION_LAYERS:
+            try:
+                # Only the layer that yields the GVAS inflates to total_size. Deflate cannot
+                # expand past ~1032:1, so a corrupt size can't force a huge allocation.
+                if compression_count == gvas_layer:
+                    expected_size = min(total_size, len(current_data) * 1032)
+                else:
+                    expected_size = min(total_size, len(current_data) * OUTER_LAYER_GROWTH)
+                if spill_dir is not None:
+                    decompressed = stream_decompress_to_file(current_data, spill_dir)
+                else:
+                    decompressed = stream_decompress(current_data, expected_size)
+            except (zlib.error, ValueError):
+                # Past the first layer, data that isn't a whole zlib stream is the payload
+                if compression_count == 0:
+                    raise
                 break
+
             current_data = decompressed
             compression_count += 1
-            if current_data[0:4].decode("latin-1") == "GVAS":
-                return current_data, compression_count
-
-        # Loop through chunk sizes and look for GVAS header
-        for start in range(0, len(current_data), 4096):
-            end = min(start + 4096, len(current_data))
-            chunk = current_data[start:end]
-            for i in range(len(chunk) - 4):
-                if chunk[i : i + 4].decode("latin-1") == "GVAS":
-                    gvas_offset = start + i
-                    return current_data[gvas_offset:], compression_count
-        raise ValueError("Could not find GVAS header in decompressed data")
+            if decompressed[: len(GVAS_MAGIC)] == GVAS_MAGIC:
+                if len(decompressed) != total_size:
+                    DIAGNOSTICS.warning(
+                        "decompress_gvas: declared size %s does not match decompressed size %s for %s",
+                        total_size, len(decompressed), file_path,
+                    )
+                return decompressed, compression_count
+
+        gvas_offset = current_data.find(GVAS_MAGIC) if compression_count else -1
+        if gvas_offset < 0:
+            raise ValueError("Could not find GVAS header in decompressed data")
+        return memoryview(current_data)[gvas_offset:], compression_count
     except Exception as e :
         raise Exception(f"Error in decompress_gvas: {e}")
 
 
-def parse_guild_data(properties):
+def index_guild_groups(group_save_data_map):
+    """
+    Single pass over GroupSaveDataMap.
 
+    Returns (player_index, guilds): player_index maps player_uid to
+    (Guild, player_info) and guilds maps group id to its Guild roster.
+    """
+    player_index = {}
+    guilds = {}
+    for group in group_save_data_map:
+        raw_data = group.get("value", {}).get("RawData", {}).get("value", {})
+        if not raw_data:
+            DIAGNOSTICS.warning("index_guild_groups: skipping group as no raw data")
+            continue
+        players = raw_data.get("players", {}).get("value", [])
+        if not players:
+            continue
 
-    print(
-        "parse_guild_data: Starting to parse guild data and player data using load_character_save_parameter_map."
-    )
+        group_id = PalObjects.get_BaseType(raw_data.get("group_id", {})) or group.get("key")
+        guild_name = PalObjects.get_BaseType(raw_data.get("guild_name", {})) or "Unnamed Guild"
+        guild = Guild(id=str(group_id), guildName=str(guild_name), members=[])
+        guilds[guild.id] = guild
 
-    try:
-        player_info, working_pal_info, dangling_pal_info = load_character_save_parameter_map(
-            properties
-        )
+        for player in players:
+            try:
+                player_uid = str(PalObjects.get_BaseType(player.get("player_uid", {})))
+                player_data = player.get("player_info", {}).get("value", {})
+                player_index[player_uid] = (guild, player_data)
+            except Exception as e:
+                DIAGNOSTICS.warning("index_guild_groups: failed to read player %s", e)
+                continue
+    return player_index, guilds
+
+
+def parse_guild_data(properties, trace: ParseTrace = None):
+    """
+    Builds the guild rosters and per-player info, timing the character map and
+    guild passes into `trace` when one is given.
+
+    Returns (guilds, player_data_by_uid): guilds is a list of Guild with one
+    GuildMember per player carrying their owned pals, player_data_by_uid maps
+    every player found in CharacterSaveParameterMap to name, guild and last online times.
+    """
 
-        print(f"parse_guild_data: player info {player_info}")
-        print(f"parse_guild_data: working_pal_info {working_pal_info}")
-        print(f"parse_guild_data: dangling_pal_info {dangling_pal_info}")
+
+    DIAGNOSTICS.info("parse_guild_data: Starting to parse guild data and player data")
+
+    trace = trace or ParseTrace()
+    try:
+        with trace.phase("load_character_save_parameter_map"):
+            player_info, working_pal_info, dangling_pal_info, pals_by_owner = load_character_save_parameter_map(
+                properties
+            )
+        trace.count("players", len(player_info))
+        trace.count("owned_pals", len(working_pal_info))
+        trace.count("dangling_pals", len(dangling_pal_info))
+
+        if DIAGNOSTICS.enabled(DEBUG):
+            DIAGNOSTICS.debug("parse_guild_data: player info %s", player_info)
+            DIAGNOSTICS.debug("parse_guild_data: working_pal_info %s", working_pal_info)
+            DIAGNOSTICS.debug("parse_guild_data: dangling_pal_info %s", dangling_pal_info)
         world_save_data = properties.get("worldSaveData", {}).get("value", {})
         
         if not world_save_data or not world_save_data.get("GroupSaveDataMap", {}).get("value"):
-            print("parse_guild_data: No GroupSaveDataMap found")
-            return {}
+            DIAGNOSTICS.warning("parse_guild_data: No GroupSaveDataMap found")
+            return [], {}
+
+        with trace.phase("index_guild_groups"):
+            player_index, guilds = index_guild_groups(world_save_data["GroupSaveDataMap"]["value"])
+
+            for player_uid, (guild, player_data) in player_index.items():
+                name = str(PalObjects.get_BaseType(player_data.get("player_name", {})))
+                pals = pals_by_owner.get(player_uid, [])
+                for pal in pals:
+                    pal.guildMember = name
+                guild.members.append(GuildMember(id=player_uid, name=name, pals=pals))
+        trace.count("guilds", len(guilds))
+        trace.progress("guilds_indexed", len(guilds), len(guilds))
+
         player_data_by_uid = {}
         for player_uid in player_info:
-
-            for group in world_save_data.get("GroupSaveDataMap", {}).get(
-                "value", []
-            ):
-                raw_data = (
-                    group.get("value", {})
-                    .get("RawData", {})
-                    .get("value", {})
-                )
-                if not raw_data:
-                    print("parse_guild_data: skipping group as no raw data")
-                    continue
-                players = raw_data.get("players", {}).get("value", [])
-                for player in players:
-                    player_data = player.get("player_info", {}).get(
-                        "value", {}
-                    )
-                    try:
-                        if str(player.get("player_uid", {}).get("value", "")) == str(
-                            player_uid
-                        ):
-                            player_data_by_uid[str(player_uid)] = {
-                                "name": str(
-                                    PalObjects.get_BaseType(
-                                        player_data.get("player_name", {})
-                                    )
-                                ),
-                                "last_online_real_time": str(
-                                    PalObjects.get_BaseType(
-                                        player_data.get(
-                                            "last_online_real_time", {}
-                                        )
-                                    )
-                                ),
-                                "last_online_time": str(
-                                    PalObjects.get_BaseType(
-                                        player_data.get("last_online_time", {})
-                                    )
-                                ),
-                            }
-                    except Exception as e:
-                        print(f"parse_guild_data: failed to read player {e}")
-                        continue
-        return player_data_by_uid
+            player_uid = str(player_uid)
+            if player_uid not in player_index:
+                continue
+            guild, player_data = player_index[player_uid]
+            player_data_by_uid[player_uid] = {
+                "name": str(PalObjects.get_BaseType(player_data.get("player_name", {}))),
+                "guild_id": guild.id,
+                "last_online_real_time": str(
+                    PalObjects.get_BaseType(player_data.get("last_online_real_time", {}))
+                ),
+                "last_online_time": str(
+                    PalObjects.get_BaseType(player_data.get("last_online_time", {}))
+                ),
+            }
+        return list(guilds.values()), player_data_by_uid
     except Exception as e:
         raise Exception(f"parse_guild_data: Error in parse_guild_data: {e}") from e
 
 
-def parse_save_file(file_content, file_path):
+INCREMENTAL_MAP = "CharacterSaveParameterMap"
+
+
+def parse_save_file(
+    file_content,
+    file_path,
+    selection: PathSelection = BREEDER_SELECTION,
+    trace: ParseTrace = None,
+    entry_cache: EntryCache = None,
+    world_id: str = "",
+    spill_dir: str = None,
+    decoder: ParallelDecoder = None,
+    lazy: bool = False,
+):
+    """
+    Decompresses and parses a Level.sav into (guilds, player_data).
+
+    Pass a ParseTrace to collect phase durations, bytes in/out per phase,
+    property counts by type and skipped-byte totals. With an EntryCache and a
+    world GUID in `world_id`, CharacterSaveParameterMap entries whose bytes
+    match the previous parse of the same world are reused instead of decoded.
+    `file_content` may be a map_file() mapping; with `spill_dir` the
+    decompressed GVAS is mapped from a temp file there too, and walked pages
+    are released as the walk moves on. A ParallelDecoder fans the
+    CharacterSaveParameterMap entries out to its process pool. With `lazy`, the
+    walk only steps over nested property lists and the breeder passes decode
+    just the fields they read; property counts then cover only those fields,
+    and neither the entry cache nor the decoder is used.
+    """
+    trace = trace or ParseTrace()
     try:
-        data, compression_count = decompress_gvas(file_content, file_path)
-        parse_gvas_header(data)        
+        with trace.phase("decompress_gvas", bytes_in=len(file_content)) as record:
+            data, compression_count = decompress_gvas(file_content, file_path, spill_dir)
+            record["bytes_out"] = len(data)
+        trace.count("compression_layers", compression_count)
+        trace.progress("decompressed", len(data), len(data))
+        reader = GvasReader(data)
+        with trace.phase("parse_gvas_header", bytes_in=GvasReader.HEADER.size):
+            parse_gvas_header(reader)
     except Exception as e:
-        print(f"parse_save_file: Error parsing gvas_header: {e}")
+        DIAGNOSTICS.error("parse_save_file: Error parsing gvas_header: %s", e)
+        DIAGNOSTICS.dump(f"parse of {file_path} failed")
         return [], {}
-    properties, _ = parse_gvas_properties(data, 28)
-    player_data = parse_guild_data(properties)
-    return {}, player_data
+    reader.lazy = lazy
+    reader.decoder = None if lazy else decoder
+    world_key = None
+    if entry_cache is not None and not lazy:
+        variant = ",".join(sorted(selection.include or ())) + "|" + ",".join(sorted(selection.skip))
+        world_key = entry_cache.world_key(data[: GvasReader.HEADER.size], world_id, variant)
+    if world_key is not None:
+        with trace.phase("entry_cache_load"):
+            reader.entry_memo = MapEntryMemo(INCREMENTAL_MAP, entry_cache.get(world_key))
+    if trace.on_progress is not None:
+        def report_map_progress(map_name, done, total):
+            if map_name == "CharacterSaveParameterMap":
+                trace.progress("characters_parsed", done, total)
+        reader.progress = report_map_progress
+    try:
+        with trace.phase("parse_gvas_properties", bytes_in=len(data)) as record:
+            start = reader.offset
+            properties = parse_gvas_properties(reader, selection=selection)
+            record["bytes_out"] = reader.offset - start - reader.skipped_bytes
+        trace.count("skipped_bytes", reader.skipped_bytes)
+        memo = reader.entry_memo
+        if memo is not None:
+            trace.count("entry_cache_hits", memo.hits)
+            trace.count("entry_cache_misses", memo.misses)
+            if memo.changed and memo.current:
+                with trace.phase("entry_cache_store"):
+                    entry_cache.put(world_key, memo.current)
+        with trace.phase("parse_guild_data"):
+            guilds, player_data = parse_guild_data(properties, trace)
+        # Taken after the guild pass, which is where a lazy tree gets decoded
+        trace.count("property_counts", dict(reader.property_counts))
+        if not player_data:
+            DIAGNOSTICS.dump(f"no players found in {file_path}")
+        return guilds, player_data
     except Exception as e:
-        print(f"parse_save_file: Error parsing file: {e}")
+        DIAGNOSTICS.error("parse_save_file: Error parsing file: %s", e)
+        DIAGNOSTICS.dump(f"parse of {file_path} failed")
         return [], {}
 
 
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2 :
-        print("Usage: python save_parser.py <file_path>")
+def parse_save_file_cached(
+    file_content,
+    file_path,
+    cache: ParseCache = None,
+    layout: str = "objects",
+    trace: ParseTrace = None,
+    entry_cache: EntryCache = None,
+    world_id: str = "",
+    spill_dir: str = None,
+    decoder: ParallelDecoder = None,
+    lazy: bool = False,
+):
+    """
+    parse_save_file fronted by a ParseCache, with guilds in the requested roster
+    layout. A hit skips decompression and the property walk entirely; empty
+    results are not cached so failures get retried. On a miss, `entry_cache`
+    still lets an upload of a known world re-decode only its changed entries.
+    """
+    if layout not in ROSTER_LAYOUTS:
+        raise ValueError(f"Unknown roster layout: {layout}")
+    trace = trace or ParseTrace()
+
+    if cache is not None:
+        with trace.phase("cache_lookup", bytes_in=len(file_content)):
+            key = cache.key(file_content, layout)
+            cached = cache.get(key)
+        trace.count("cache_hit", cached is not None)
+        if cached is not None:
+            DIAGNOSTICS.info("parse_save_file_cached: cache hit %s", key)
+            return cached["guilds"], cached["player_data"]
+
+    guilds, player_data = parse_save_file(
+        file_content,
+        file_path,
+        trace=trace,
+        entry_cache=entry_cache,
+        world_id=world_id,
+        spill_dir=spill_dir,
+        decoder=decoder,
+        lazy=lazy,
+    )
+    if layout == "columnar":
+        with trace.phase("build_columnar_roster"):
+            guilds = build_columnar_roster(guilds)
+    if cache is not None and player_data:
+        try:
+            cache.put(key, {"guilds": guilds, "player_data": player_data}, GuildDataEncoder)
+        except Exception as e:
+            DIAGNOSTICS.warning("parse_save_file_cached: failed to store %s: %s", key, e)
+    return guilds, player_data
+
+
+FRAME_HEADER = struct.Struct("<I")
+
+
+def read_frame(stream):
+    """
+    Reads one length-prefixed frame (little-endian uint32 size, then payload).
+    Returns None on a clean EOF or a truncated frame.
+    """
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    payload = stream.read(size)
+    if len(payload) < size:
+        return None
+    return payload
+
+
+def read_exact(stream, size: int):
+    """
+    Reads exactly `size` bytes into one preallocated buffer, so a streamed save
+    lands in memory once without intermediate chunk copies. Returns None if the
+    stream ends early.
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    filled = 0
+    while filled < size:
+        count = stream.readinto(view[filled:])
+        if not count:
+            return None
+        filled += count
+    return buffer
+
+
+def write_frame(stream, payload: bytes):
+    stream.write(FRAME_HEADER.pack(len(payload)))
+    stream.write(payload)
+    stream.flush()
+
+
+OUTPUT_FORMATS = ("json", "msgpack")
+
+
+def encode_payload(payload: dict, output_format: str) -> bytes:
+    """
+    Serializes a response payload. Both formats are self-describing and carry
+    the same structure, so either decodes to the same object.
+    """
+    if output_format == "msgpack":
+        return msgpack_lite.packb(payload, default=GuildDataEncoder().default)
+    if output_format == "json":
+        return json.dumps(payload, cls=GuildDataEncoder, separators=(",", ":")).encode("utf-8")
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def handle_worker_request(
+    request: dict,
+    cache: ParseCache = None,
+    trace: ParseTrace = None,
+    file_content=None,
+    entry_cache: EntryCache = None,
+    use_mmap: bool = False,
+    spill_dir: str = None,
+    decoder: ParallelDecoder = None,
+    lazy: bool = False,
+) -> dict:
+    if request.get("breeding_search") is not None:
+        # Loaded on the first search so parse-only workers don't build the breeding table
+        from breeding_search import search_request
+
+        with (trace or ParseTrace()).phase("breeding_search"):
+            return search_request(request["breeding_search"])
+    file_path = request.get("file_path") or "<stdin>"
+    if file_content is None:
+        file_content = map_file(file_path) if use_mmap else read_file(file_path, text=False)
+    layout = request.get("layout") or "objects"
+    guilds, player_data = parse_save_file_cached(
+        file_content, file_path, cache, layout, trace, entry_cache, request.get("world_id") or "", spill_dir, decoder, lazy
+    )
+    return {"guilds": guilds, "playerData": player_data}
+
+
+def run_worker(
+    cache: ParseCache = None,
+    entry_cache: EntryCache = None,
+    use_mmap: bool = False,
+    spill_dir: str = None,
+    decoder: ParallelDecoder = None,
+    lazy: bool = False,
+):
+    """
+    Persistent worker mode used by server.js. `use_mmap`, `spill_dir`,
+    `decoder` and `lazy` apply to every request, as for the CLI.
+
+    Each request frame is a JSON object {"id", "file_path", "layout"?, "format"?, "trace"?,
+    "world_id"?}; with an EntryCache, repeat uploads of a world GUID re-decode
+    only changed entries.
+    A request may carry "content_length" instead of "file_path", in which case
+    exactly that many raw save bytes follow the frame on stdin. A request
+    with "breeding_search" (see breeding_search.search_request) runs a path
+    search over the roster it carries instead of parsing. With
+    "progress": true, parser milestones are sent as {"id", "progress"} frames
+    before the response. Each response is a JSON envelope frame {"id", "ok", "format", "trace"?} followed, when ok,
+    by one payload frame encoded in the requested format; failures send only
+    {"id", "ok": false, "error"}. Diagnostics are buffered per request and
+    dumped to stderr when it fails, so stdout only ever carries frames.
+    """
+    frames_in = sys.stdin.buffer
+    frames_out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+
+    while (frame := read_frame(frames_in)) is not None:
+        request_id = None
+        DIAGNOSTICS.clear()
+        try:
+            request = json.loads(frame)
+            request_id = request.get("id")
+            file_content = None
+            if request.get("content_length") is not None:
+                file_content = read_exact(frames_in, int(request["content_length"]))
+                if file_content is None:
+                    DIAGNOSTICS.error("run_worker: request %s body truncated, exiting", request_id)
+                    DIAGNOSTICS.dump(f"request {request_id} failed")
+                    break
+            output_format = request.get("format") or "json"
+            trace = ParseTrace()
+            if request.get("progress"):
+                trace.on_progress = lambda event, request_id=request_id: write_frame(
+                    frames_out, json.dumps({"id": request_id, "progress": event}).encode("utf-8")
+                )
+            payload = handle_worker_request(
+                request, cache, trace, file_content, entry_cache, use_mmap, spill_dir, decoder, lazy
+            )
+            with trace.phase("encode_payload") as record:
+                payload = encode_payload(payload, output_format)
+                record["bytes_out"] = len(payload)
+        except Exception as e:
+            DIAGNOSTICS.error("run_worker: request %s failed: %s", request_id, e)
+            DIAGNOSTICS.dump(f"request {request_id} failed")
+            envelope = {"id": request_id, "ok": False, "error": str(e)}
+            write_frame(frames_out, json.dumps(envelope).encode("utf-8"))
+            continue
+        envelope = {"id": request_id, "ok": True, "format": output_format}
+        if request.get("trace"):
+            envelope["trace"] = trace.summary()
+        write_frame(frames_out, json.dumps(envelope).encode("utf-8"))
+        write_frame(frames_out, payload)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Palworld Level.sav parser for the breeder.")
+    parser.add_argument("file_path", nargs="?", help="Path to the Level.sav file to parse, or - for stdin.")
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Serve length-prefixed JSON requests on stdin until EOF.",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=ROSTER_LAYOUTS,
+        default="objects",
+        help="Guild roster layout: one object per pal, or interned columnar arrays.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="Output encoding. msgpack writes one binary document to stdout.",
+    )
+    parser.add_argument(
+        "--trace-out",
+        help="Write a Chrome trace-event JSON file of the parse phases to this path.",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Map the save file instead of reading it into memory.",
+    )
+    parser.add_argument(
+        "--spill",
+        nargs="?",
+        const=tempfile.gettempdir(),
+        metavar="DIR",
+        help="Decompress into a temp file in DIR (default: the system temp dir) and map it, bounding peak RSS.",
+    )
+    parser.add_argument(
+        "--decode-processes",
+        type=int,
+        default=int(os.environ.get("SAVE_PARSER_DECODE_PROCESSES") or 0),
+        help="Decode CharacterSaveParameterMap entries on this many processes (0 decodes in-process).",
+    )
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        default=os.environ.get("SAVE_PARSER_LAZY") == "1",
+        help="Decode nested properties only when the breeder reads them (disables the entry cache and --decode-processes).",
+    )
+    parser.add_argument(
+        "--write-index",
+        action="store_true",
+        help="Also write <file>.gvas and <file>.gvas.idx sidecars for point lookups (see save_index.py).",
+    )
+    parser.add_argument(
+        "--world-id",
+        default="",
+        help="World GUID; with --entry-cache-mb, unchanged characters of a known world are not decoded again.",
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=tuple(LEVELS),
+        default=os.environ.get("SAVE_PARSER_LOG_LEVEL") or "info",
+        help="Lowest diagnostics level kept in the buffer dumped to stderr when a parse fails.",
+    )
+    parser.add_argument(
+        "--log-buffer",
+        type=int,
+        default=512,
+        help="Number of most recent diagnostics events kept for a failure dump.",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Write diagnostics to stderr as they happen instead of only on failure.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.environ.get("SAVE_PARSER_CACHE_DIR"),
+        help="Directory for the parse-result cache. Disabled when unset.",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=512,
+        help="Size bound of the parse-result cache in MiB.",
+    )
+    parser.add_argument(
+        "--entry-cache-mb",
+        type=int,
+        default=int(os.environ.get("SAVE_PARSER_ENTRY_CACHE_MB") or 0),
+        help="Memoize decoded characters per world GUID, up to this many MiB in memory and under --cache-dir (0 disables).",
+    )
+    args = parser.parse_args(argv)
+    DIAGNOSTICS.configure(LEVELS[args.log_level], args.log_buffer, args.verbose)
+
+    cache = None
+    if args.cache_dir:
+        cache = ParseCache(args.cache_dir, PARSER_VERSION, args.cache_max_mb * 1024 * 1024)
+    entry_cache = None
+    if args.entry_cache_mb > 0:
+        # Without a cache directory the memo only lives as long as the process, which suits a warm worker
+        entry_directory = os.path.join(args.cache_dir, "entries") if args.cache_dir else None
+        entry_cache = EntryCache(entry_directory, PARSER_VERSION, args.entry_cache_mb * 1024 * 1024)
+
+    decoder = ParallelDecoder(args.decode_processes) if args.decode_processes > 0 else None
+
+    if args.worker:
+        try:
+            run_worker(cache, entry_cache, args.mmap, args.spill, decoder, args.lazy)
+        finally:
+            if decoder is not None:
+                decoder.close()
+        return
+    if not args.file_path:
+        print("Usage: python save_parser.py <file_path> | --worker", file=sys.stderr)
         sys.exit(1)
-    file_path = sys.argv[1]
-    print(f"Python Script: File path received - {file_path}")
+
+    binary_out = None
+    if args.format != "json":
+        binary_out = sys.stdout.buffer
+        sys.stdout = sys.stderr
+
+    file_path = args.file_path
+    DIAGNOSTICS.info("Python Script: File path received - %s", file_path)
     file_content = None
     try:
-        file_content = read_file(file_path, text=False)
+        if file_path == "-":
+            file_content = sys.stdin.buffer.read()
+        elif args.mmap:
+            file_content = map_file(file_path)
+        else:
+            file_content = read_file(file_path, text=False)
     except Exception as e:
-        print(f"Error in __main__ read_file: {e}")
+        DIAGNOSTICS.error("Error in __main__ read_file: %s", e)
+        DIAGNOSTICS.dump(f"reading {file_path} failed")
         file_content = None
+    trace = ParseTrace()
     if file_content is not None:
-        guilds, player_data = parse_save_file(file_content, file_path)
+        guilds, player_data = parse_save_file_cached(
+            file_content, file_path, cache, args.layout, trace, entry_cache, args.world_id, args.spill, decoder, args.lazy
+        )
+        if decoder is not None:
+            decoder.close()
     else : 
         guilds, player_data = None, None
+    if args.write_index and file_content is not None:
+        # save_index builds on this module, so it is only imported when asked for
+        from save_index import write_save_index
+
+        with trace.phase("write_save_index"):
+            write_save_index(file_path, file_content)
+    if args.trace_out:
+        trace.write_chrome_trace(args.trace_out)
+    if binary_out is not None:
+        binary_out.write(encode_payload({"guilds": guilds, "playerData": player_data}, args.format))
+        binary_out.flush()
+        return
     try:
-        print(json.dumps(guilds))
+        print(json.dumps(guilds, cls=GuildDataEncoder))
     except:
         print(json.dumps([]))
     try:
         print(json.dumps(player_data))
     except:
-        print(json.dumps([]))
\ No newline at end of file
+        print(json.dumps([]))
+
+
+if __name__ == "__main__":
+    main()
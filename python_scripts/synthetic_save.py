@@ -0,0 +1,234 @@
+"""
+Synthetic Level.sav generator for parser benchmarks.
+
+Writes saves in the layout save_parser reads: the <magic, total_size, chunk_magic>
+header, one or more zlib layers, then a GVAS header and a property tree with a
+CharacterSaveParameterMap and GroupSaveDataMap shaped like a real world.
+"""
+
+import argparse
+import random
+import struct
+import uuid
+import zlib
+
+
+SAV_MAGIC = 0x014B0622
+SAV_HEADER = struct.Struct("<III")
+GVAS_HEADER = struct.Struct("<4sIIHHH2xII")
+SIZED_PROPERTY_TYPES = ("StrProperty", "ArrayProperty", "MapProperty", "StructProperty")
+EMPTY_UUID = str(uuid.UUID(int=0))
+
+SPECIES = (
+    "SheepBall", "PinkCat", "ChickenPal", "Carbunclo", "Kitsunebi", "Penguin",
+    "Hedgehog", "Garm", "Boar", "FlameBambi", "Alpaca", "Anubis", "Baphomet",
+    "BlueDragon", "CuteFox", "DrillGame", "Eagle", "ElecPanda", "FairyDragon",
+    "GrassMammoth", "HadesBird", "IceDeer", "JetDragon", "KingAlpaca", "LazyDragon",
+    "LilyQueen", "Mutant", "NegativeKoala", "PlantSlime", "RobinHood",
+)
+PASSIVES = (
+    "Rare", "Noble", "Legend", "CraftSpeed_up2", "CraftSpeed_up1", "PAL_ALLAttack_up2",
+    "Deffence_up2", "MoveSpeed_up_2", "Witch", "ElementBoost_Fire_2_PAL",
+    "Nocturnal", "Vampire", "PAL_CorporateSlave", "TrainerWorkSpeed_UP_1",
+    "PAL_FullStomach_Down_2", "PAL_Sanity_Down_2", "ElementResist_Ice_1_PAL",
+)
+
+
+def fstring(value: str) -> bytes:
+    if not value:
+        return struct.pack("<i", 0)
+    data = value.encode("utf-8") + b"\0"
+    return struct.pack("<i", len(data)) + data
+
+
+def prop(name: str, property_type: str, payload: bytes) -> bytes:
+    header = fstring(name) + fstring(property_type)
+    if property_type in SIZED_PROPERTY_TYPES:
+        header += struct.pack("<i", len(payload))
+    return header + payload
+
+
+def properties(items) -> bytes:
+    return b"".join(items) + fstring("None")
+
+
+def str_prop(name: str, value: str) -> bytes:
+    return prop(name, "StrProperty", fstring(value))
+
+
+def name_prop(name: str, value: str) -> bytes:
+    return prop(name, "NameProperty", fstring(value))
+
+
+def enum_prop(name: str, value: str) -> bytes:
+    return prop(name, "EnumProperty", fstring(value))
+
+
+def int_prop(name: str, value: int) -> bytes:
+    return prop(name, "IntProperty", struct.pack("<i", value))
+
+
+def int64_prop(name: str, value: int) -> bytes:
+    return prop(name, "Int64Property", struct.pack("<Q", value))
+
+
+def struct_prop(name: str, struct_type: str, items) -> bytes:
+    return prop(name, "StructProperty", fstring(struct_type) + bytes(16) + properties(items))
+
+
+def name_array_prop(name: str, values) -> bytes:
+    body = fstring("NameProperty") + struct.pack("<i", len(values))
+    return prop(name, "ArrayProperty", body + b"".join(fstring(v) for v in values))
+
+
+def struct_array_prop(name: str, elements) -> bytes:
+    body = fstring("StructProperty") + struct.pack("<i", len(elements))
+    return prop(name, "ArrayProperty", body + b"".join(elements))
+
+
+def map_prop(name: str, key_type: str, value_type: str, entries) -> bytes:
+    body = fstring(key_type) + fstring(value_type) + struct.pack("<i", len(entries))
+    return prop(name, "MapProperty", body + b"".join(key + value for key, value in entries))
+
+
+def character_entries(rng: random.Random, player_uids, pals_per_player: int, passives_per_pal: int):
+    entries = []
+    for player_uid in player_uids:
+        key = properties([str_prop("PlayerUId", player_uid), str_prop("InstanceId", str(uuid.UUID(int=rng.getrandbits(128))))])
+        value = properties([
+            struct_prop("RawData", "PalIndividualCharacterSaveParameter", [
+                enum_prop("CharacterType", "EPalCharacterType::Player"),
+                int_prop("Level", rng.randint(1, 55)),
+            ])
+        ])
+        entries.append((key, value))
+        for _ in range(pals_per_player):
+            key = properties([str_prop("PlayerUId", EMPTY_UUID), str_prop("InstanceId", str(uuid.UUID(int=rng.getrandbits(128))))])
+            value = properties([
+                struct_prop("RawData", "PalIndividualCharacterSaveParameter", [
+                    enum_prop("CharacterType", "EPalCharacterType::Pal"),
+                    str_prop("OwnerPlayerUId", player_uid),
+                    name_prop("CharacterID", rng.choice(SPECIES)),
+                    int_prop("Level", rng.randint(1, 55)),
+                    int64_prop("Exp", rng.getrandbits(24)),
+                    name_array_prop("PassiveSkillList", rng.sample(PASSIVES, passives_per_pal)),
+                ])
+            ])
+            entries.append((key, value))
+    return entries
+
+
+def group_entries(rng: random.Random, player_uids, guilds: int):
+    entries = []
+    for index in range(guilds):
+        group_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        members = [
+            properties([
+                str_prop("player_uid", player_uid),
+                struct_prop("player_info", "PlayerInfo", [
+                    str_prop("player_name", f"Player{player_index}"),
+                    int64_prop("last_online_real_time", rng.getrandbits(40)),
+                ]),
+            ])
+            for player_index, player_uid in enumerate(player_uids)
+            if player_index % guilds == index
+        ]
+        value = properties([
+            struct_prop("RawData", "GroupSaveData", [
+                str_prop("group_id", group_id),
+                enum_prop("group_type", "EPalGroupType::Guild"),
+                str_prop("guild_name", f"Guild{index}"),
+                struct_array_prop("players", members),
+            ])
+        ])
+        entries.append((fstring(group_id), value))
+    return entries
+
+
+def filler_entries(rng: random.Random, count: int):
+    """
+    World data the breeder never reads (map objects), so selective parsing has something to skip.
+    """
+    return [
+        properties([
+            str_prop("MapObjectId", str(uuid.UUID(int=rng.getrandbits(128)))),
+            int_prop("Hp", rng.randint(1, 5000)),
+            str_prop("ConcreteModel", "x" * rng.randint(16, 96)),
+        ])
+        for _ in range(count)
+    ]
+
+
+def generate_gvas(
+    players: int,
+    guilds: int,
+    pals_per_player: int,
+    passives_per_pal: int = 2,
+    filler: int = 0,
+    seed: int = 0,
+) -> bytes:
+    """
+    Builds a decompressed GVAS document with `players` players spread round-robin
+    over `guilds` guilds, each owning `pals_per_player` pals.
+    """
+    if guilds < 1 or guilds > max(players, 1):
+        raise ValueError("guilds must be between 1 and the number of players")
+    if not 0 <= passives_per_pal <= len(PASSIVES):
+        raise ValueError(f"passives_per_pal must be between 0 and {len(PASSIVES)}")
+
+    rng = random.Random(seed)
+    player_uids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(players)]
+    world = struct_prop("worldSaveData", "PalWorldSaveData", [
+        struct_array_prop("MapObjectSaveData", filler_entries(rng, filler)),
+        map_prop("CharacterSaveParameterMap", "StructProperty", "StructProperty",
+                 character_entries(rng, player_uids, pals_per_player, passives_per_pal)),
+        map_prop("GroupSaveDataMap", "StrProperty", "StructProperty", group_entries(rng, player_uids, guilds)),
+    ])
+    header = GVAS_HEADER.pack(b"GVAS", 3, 522, 5, 1, 1, 0, 0)
+    return header + properties([int64_prop("Timestamp", 638486453957560000), world])
+
+
+def compress_gvas(gvas: bytes, layers: int = 1, level: int = 6) -> bytes:
+    data = gvas
+    for _ in range(layers):
+        data = zlib.compress(data, level)
+    chunk_magic = 0x31 if layers > 1 else 0x32
+    return SAV_HEADER.pack(SAV_MAGIC, len(gvas), chunk_magic) + data
+
+
+def generate_level_sav(
+    players: int,
+    guilds: int,
+    pals_per_player: int,
+    passives_per_pal: int = 2,
+    filler: int = 0,
+    seed: int = 0,
+    layers: int = 1,
+) -> bytes:
+    gvas = generate_gvas(players, guilds, pals_per_player, passives_per_pal, filler, seed)
+    return compress_gvas(gvas, layers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Level.sav for parser benchmarks.")
+    parser.add_argument("output", help="Where to write the .sav file.")
+    parser.add_argument("--players", type=int, default=16)
+    parser.add_argument("--guilds", type=int, default=4)
+    parser.add_argument("--pals-per-player", type=int, default=64)
+    parser.add_argument("--passives-per-pal", type=int, default=2)
+    parser.add_argument("--filler", type=int, default=0, help="Number of MapObjectSaveData entries to pad the world with.")
+    parser.add_argument("--layers", type=int, default=1, help="Number of zlib compression layers.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    data = generate_level_sav(
+        args.players, args.guilds, args.pals_per_player, args.passives_per_pal,
+        args.filler, args.seed, args.layers,
+    )
+    with open(args.output, "wb") as f:
+        f.write(data)
+    print(f"Wrote {len(data)} bytes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,412 @@
 const express = require('express');
 const cors = require('cors');
-const { execSync } = require('child_process');
+const { spawn } = require('child_process');
 const { v4: uuidv4 } = require('uuid');
 const fs = require('fs');
+const os = require('os');
 const path = require('path');
+const { pipeline } = require('stream');
 
 const app = express();
 const port = 3001;
 
+const pythonScriptPath = path.join(__dirname, 'python_scripts', 'save_parser.py');
+const parserWorkerCount = parseInt(process.env.PARSER_WORKERS || '', 10) || Math.min(4, os.cpus().length);
+const workerRestartDelayMs = 1000;
+const parseCacheDir = process.env.SAVE_PARSER_CACHE_DIR || path.join(os.tmpdir(), 'palworld-breeder-cache');
+const parseCacheMaxMb = process.env.SAVE_PARSER_CACHE_MAX_MB || '512';
+// Opt-in memo of decoded characters per world GUID, so re-uploads of a world re-decode only what changed
+const parseEntryCacheMb = process.env.SAVE_PARSER_ENTRY_CACHE_MB;
+// When set, workers decompress into temp files there and map them instead of holding the GVAS in memory
+const parseSpillDir = process.env.SAVE_PARSER_SPILL_DIR;
+const maxUploadBytes = (parseInt(process.env.SAVE_UPLOAD_MAX_MB || '', 10) || 512) * 1024 * 1024;
+// Jobs waiting for a worker beyond this are refused with 503 instead of piling up in memory
+const parserMaxQueue = parseInt(process.env.PARSER_MAX_QUEUE || '', 10) || 32;
+const jobRetentionMs = 5 * 60 * 1000;
+// Finished jobs kept for polling, and the result bytes they may hold; the oldest are dropped first
+const jobRetainMax = parseInt(process.env.JOB_RETAIN_MAX || '', 10) || 64;
+const jobRetainMaxBytes = (parseInt(process.env.JOB_RETAIN_MAX_MB || '', 10) || 256) * 1024 * 1024;
+// Breeding searches post the guild roster as JSON
+const jsonBodyLimit = process.env.JSON_BODY_LIMIT || '16mb';
+const breedingMaxGenerations = 8;
+const breedingMaxTimeBudgetMs = 2000;
+
+
+const responseContentTypes = {
+    json: 'application/json',
+    msgpack: 'application/msgpack',
+};
+
+
+/**
+ * One warm `save_parser.py --worker` process. Requests and responses are
+ * length-prefixed frames (little-endian uint32 size + payload). Each response
+ * is a JSON envelope frame, followed by an already-encoded payload frame when
+ * the parse succeeded. A job with a `body` stream sends `content_length` instead
+ * of a file path and pipes the raw save straight into stdin after the frame;
+ * a job with a `search` sends it as a breeding path search instead of a parse.
+ * Progress frames ({ id, progress }) may arrive before the envelope.
+ */
+class ParserWorker {
+    constructor(id, onIdle) {
+        this.id = id;
+        this.onIdle = onIdle;
+        this.job = null;
+        this.envelope = null;
+        // Why the worker is being killed, reported to the in-flight job when it exits
+        this.killReason = null;
+        this.lastWorldId = null;
+        this.buffer = Buffer.alloc(0);
+        this.start();
+    }
+
+    start() {
+        this.ready = true;
+        // A fresh process has no in-memory entry memos
+        this.lastWorldId = null;
+        const args = [pythonScriptPath, '--worker', '--mmap', '--cache-dir', parseCacheDir, '--cache-max-mb', parseCacheMaxMb];
+        if (parseSpillDir) {
+            args.push('--spill', parseSpillDir);
+        }
+        if (parseEntryCacheMb) {
+            args.push('--entry-cache-mb', parseEntryCacheMb);
+        }
+        this.process = spawn('python3', args, {
+            stdio: ['pipe', 'pipe', 'inherit'],
+        });
+        const child = this.process;
+        // Writing a frame to a worker that just died fails with EPIPE; unhandled, that error would exit the server
+        child.stdin.on('error', (err) => this.onStdinError(child, err));
+        child.stdout.on('data', (chunk) => this.onData(chunk));
+        child.on('exit', (code, signal) => this.onExit(code, signal));
+        child.on('error', (err) => console.error(`Parser worker ${this.id} error:`, err));
+        console.log(`Parser worker ${this.id} started (pid ${child.pid})`);
+    }
+
+    onStdinError(child, err) {
+        console.error(`Parser worker ${this.id} stdin error:`, err.message);
+        // The exit handler rejects the in-flight job and restarts the worker
+        if (child.exitCode === null && child.signalCode === null) {
+            child.kill('SIGKILL');
+        }
+    }
+
+    get idle() {
+        return this.ready && this.job === null;
+    }
+
+    send(job) {
+        const body = job.body;
+        if (body && (body.stream.destroyed || body.stream.readableAborted)) {
+            // The client went away while the job was queued
+            job.reject(new Error('Upload aborted before parsing started'));
+            this.onIdle();
+            return;
+        }
+        this.job = job;
+        job.state = 'running';
+        if (job.worldId) {
+            this.lastWorldId = job.worldId;
+        }
+        const request = {
+            id: job.id,
+            layout: job.layout,
+            format: job.format,
+            world_id: job.worldId,
+            trace: true,
+            progress: true,
+        };
+        if (job.search) {
+            request.breeding_search = job.search;
+        } else if (body) {
+            request.content_length = body.length;
+        } else {
+            request.file_path = job.filePath;
+        }
+        const payload = Buffer.from(JSON.stringify(request), 'utf-8');
+        const header = Buffer.alloc(4);
+        header.writeUInt32LE(payload.length, 0);
+        this.process.stdin.write(Buffer.concat([header, payload]));
+        if (body) {
+            this.streamBody(body.stream);
+        }
+    }
+
+    streamBody(stream) {
+        const stdin = this.process.stdin;
+        stream.pipe(stdin, { end: false });
+        stream.once('close', () => {
+            if (!stream.readableEnded) {
+                // The worker is waiting on bytes that will never arrive; restart it. Bytes still
+                // queued for stdin then fail with EPIPE, which onStdinError absorbs.
+                this.killReason = new Error('Upload aborted while parsing');
+                stream.unpipe(stdin);
+                this.process.kill('SIGKILL');
+            }
+        });
+    }
+
+    onData(chunk) {
+        this.buffer = Buffer.concat([this.buffer, chunk]);
+        while (this.buffer.length >= 4) {
+            const size = this.buffer.readUInt32LE(0);
+            if (this.buffer.length < 4 + size) {
+                return;
+            }
+            const frame = this.buffer.subarray(4, 4 + size);
+            this.buffer = this.buffer.subarray(4 + size);
+            this.onFrame(frame);
+        }
+    }
+
+    onFrame(frame) {
+        if (this.envelope) {
+            const envelope = this.envelope;
+            this.envelope = null;
+            this.finish((job) => job.resolve({ format: envelope.format, trace: envelope.trace, payload: frame }));
+            return;
+        }
+        let envelope;
+        try {
+            envelope = JSON.parse(frame.toString('utf-8'));
+        } catch (err) {
+            this.finish((job) => job.reject(err));
+            return;
+        }
+        if (envelope.progress && envelope.ok === undefined) {
+            if (this.job) {
+                this.job.progress = envelope.progress;
+            }
+            return;
+        }
+        if (envelope.ok) {
+            // The encoded payload follows in the next frame
+            this.envelope = envelope;
+        } else {
+            this.finish((job) => job.reject(new Error(envelope.error || 'Parser worker failed')));
+        }
+    }
+
+    finish(settle) {
+        const job = this.job;
+        this.job = null;
+        if (!job) {
+            console.error(`Parser worker ${this.id} sent a response with no pending job`);
+            return;
+        }
+        settle(job);
+        this.onIdle();
+    }
+
+    onExit(code, signal) {
+        console.error(`Parser worker ${this.id} exited (code ${code}, signal ${signal}), restarting`);
+        this.ready = false;
+        this.envelope = null;
+        this.buffer = Buffer.alloc(0);
+        if (this.job) {
+            this.job.reject(this.killReason || new Error('Parser worker crashed while parsing'));
+            this.job = null;
+        }
+        this.killReason = null;
+        setTimeout(() => {
+            this.start();
+            this.onIdle();
+        }, workerRestartDelayMs);
+    }
+}
+
+
+/**
+ * Keeps N warm parser workers and hands queued jobs to idle ones round-robin.
+ * N is the maximum number of concurrent parses; at most `maxQueue` further
+ * jobs wait for a worker.
+ */
+class ParserPool {
+    constructor(size, maxQueue) {
+        this.maxQueue = maxQueue;
+        this.queue = [];
+        this.nextWorker = 0;
+        this.workers = [];
+        for (let i = 0; i < size; i++) {
+            this.workers.push(new ParserWorker(i, () => this.dispatch()));
+        }
+    }
+
+    get full() {
+        return this.queue.length >= this.maxQueue;
+    }
+
+    get hasIdleWorker() {
+        return this.workers.some((worker) => worker.idle);
+    }
+
+    /**
+     * Queues a parse and returns its job. `source` is either { filePath } or
+     * { body: { stream, length } }; a body stream stays paused in the queue
+     * until a worker can take it. { filePath, spooling: true } holds its place in
+     * the queue until the caller clears `job.spooling` and calls dispatch().
+     * { search } queues a breeding path search. `job.done` settles with the worker result,
+     * and `job.state` moves through queued, running, then done or failed.
+     */
+    submit(source, layout, format, worldId) {
+        const job = {
+            id: uuidv4(),
+            filePath: source.filePath,
+            body: source.body,
+            search: source.search,
+            spooling: Boolean(source.spooling),
+            worldId,
+            layout,
+            format,
+            state: 'queued',
+            progress: null,
+            result: null,
+            error: null,
+        };
+        job.done = new Promise((resolve, reject) => {
+            job.resolve = (result) => {
+                job.state = 'done';
+                job.result = result;
+                resolve(result);
+            };
+            job.reject = (err) => {
+                job.state = 'failed';
+                job.error = err.message;
+                reject(err);
+            };
+        });
+        // Callers read the outcome from job.state; keep an unobserved failure from crashing the process
+        job.done.catch(() => {});
+        this.queue.push(job);
+        this.dispatch();
+        return job;
+    }
+
+    queuePosition(job) {
+        return this.queue.indexOf(job);
+    }
+
+    /** Drops a job that has not started yet and fails it with `err`. */
+    cancel(job, err) {
+        const index = this.queue.indexOf(job);
+        if (index !== -1) {
+            this.queue.splice(index, 1);
+            job.reject(err);
+        }
+    }
+
+    dispatch() {
+        for (;;) {
+            // A job whose upload is still being spooled keeps its place but can't start yet
+            const index = this.queue.findIndex((job) => !job.spooling);
+            if (index === -1) {
+                return;
+            }
+            const worker = this.takeIdleWorker(this.queue[index]);
+            if (!worker) {
+                return;
+            }
+            worker.send(this.queue.splice(index, 1)[0]);
+        }
+    }
+
+    takeIdleWorker(job) {
+        // Prefer the worker that parsed this world last; it still holds the decoded entries in memory
+        const warm = job.worldId && this.workers.find((worker) => worker.idle && worker.lastWorldId === job.worldId);
+        if (warm) {
+            return warm;
+        }
+        for (let i = 0; i < this.workers.length; i++) {
+            const worker = this.workers[(this.nextWorker + i) % this.workers.length];
+            if (worker.idle) {
+                this.nextWorker = (worker.id + 1) % this.workers.length;
+                return worker;
+            }
+        }
+        return null;
+    }
+}
+
+/**
+ * Parse jobs by id. A settled job stays pollable for `retentionMs`, but at most
+ * `maxSettled` settled jobs holding at most `maxBytes` of result payloads are
+ * kept; beyond that the oldest settled jobs are forgotten. A payload is
+ * released once it has been served.
+ */
+class JobStore {
+    constructor(retentionMs, maxSettled, maxBytes) {
+        this.retentionMs = retentionMs;
+        this.maxSettled = maxSettled;
+        this.maxBytes = maxBytes;
+        this.jobs = new Map();
+        // Settled jobs in the order they settled, with the payload bytes each holds
+        this.settled = new Map();
+        this.bytes = 0;
+    }
+
+    get(id) {
+        return this.jobs.get(id);
+    }
+
+    add(job) {
+        this.jobs.set(job.id, job);
+        job.done.catch(() => {}).finally(() => this.settle(job));
+    }
+
+    settle(job) {
+        if (!this.jobs.has(job.id)) {
+            return;
+        }
+        const size = job.result && job.result.payload ? job.result.payload.length : 0;
+        this.settled.set(job.id, size);
+        this.bytes += size;
+        setTimeout(() => this.forget(job.id), this.retentionMs);
+        for (const id of this.settled.keys()) {
+            if (this.settled.size <= this.maxSettled && this.bytes <= this.maxBytes) {
+                break;
+            }
+            this.forget(id);
+        }
+    }
+
+    /** Drops the served payload of a done job; its status stays pollable. */
+    releaseResult(job) {
+        if (!job.result || !job.result.payload) {
+            return;
+        }
+        job.result.payload = null;
+        if (this.settled.has(job.id)) {
+            this.bytes -= this.settled.get(job.id);
+            this.settled.set(job.id, 0);
+        }
+    }
+
+    forget(id) {
+        if (this.settled.has(id)) {
+            this.bytes -= this.settled.get(id);
+            this.settled.delete(id);
+        }
+        this.jobs.delete(id);
+    }
+}
+
+const parserPool = new ParserPool(parserWorkerCount, parserMaxQueue);
+const jobs = new JobStore(jobRetentionMs, jobRetainMax, jobRetainMaxBytes);
+
+
+/**
+ * Renders the worker's parse trace as a Server-Timing header value, one metric
+ * per phase with its duration in milliseconds.
+ */
+function serverTimingHeader(trace) {
+    if (!trace || !Array.isArray(trace.phases)) {
+        return null;
+    }
+    return trace.phases
+        .map((phase) => `${phase.name.replace(/[^\w-]/g, '_')};dur=${(phase.duration_us / 1000).toFixed(2)}`)
+        .join(', ');
+}
+
 
 // Configure CORS to allow requests from any origin
 const corsOptions = {
@@ -15,51 +414,99 @@ const corsOptions = {
 };
 
 app.use(cors(corsOptions));
-app.use(express.json());
+app.use(express.json({ limit: jsonBodyLimit }));
 
-app.post('/parse-save', (req, res) => {
+app.post('/parse-save', async (req, res) => {
     console.log('------------------------------------------------');
     console.log('Request received at /parse-save');
     console.log('------------------------------------------------');
 
-
-    console.log('Starting request handler for /parse-save');
-    console.log(`Request has been received.`);
+    let newFilePath = null;
     try {
         console.log('Request has started');
-        if (!req.body.file) {
-          throw new Error('No file uploaded.');
+        if (parserPool.full) {
+            res.set('Retry-After', '5').status(503).send('Parser queue is full, try again shortly');
+            return;
         }
+        // ?layout=columnar returns interned string tables plus per-pal index arrays
+        const layout = req.query.layout === 'columnar' ? 'columnar' : 'objects';
+        // Accept: application/msgpack (or application/x-msgpack) gets the binary encoding
+        const accepted = req.accepts(['application/json', 'application/msgpack', 'application/x-msgpack']);
+        const format = accepted && accepted !== 'application/json' ? 'msgpack' : 'json';
 
-        const fileContent = Buffer.from(req.body.file, 'base64');
-
+        let source;
+        if (req.is('application/octet-stream')) {
+            // Raw upload: piped straight into an idle worker's stdin, or spooled to a temp file
+            // while every worker is busy so the client gets its job id without waiting
+            const length = parseInt(req.get('Content-Length') || '', 10);
+            if (!Number.isFinite(length)) {
+                res.status(411).send('Content-Length is required');
+                return;
+            }
+            if (length > maxUploadBytes) {
+                res.status(413).send('Save file is too large');
+                return;
+            }
+            if (parserPool.hasIdleWorker) {
+                source = { body: { stream: req, length } };
+            } else {
+                newFilePath = path.join('/tmp', `upload_${uuidv4()}`);
+                source = { filePath: newFilePath, spooling: true };
+            }
+        } else {
+            if (!req.body.file) {
+              throw new Error('No file uploaded.');
+            }
 
-        const newFilename = `upload_${uuidv4()}`;
-        const newFilePath = path.join('/tmp', newFilename);
-        const pythonScriptPath = path.join(__dirname, 'python_scripts', 'save_parser.py');
+            const fileContent = Buffer.from(req.body.file, 'base64');
 
-        console.log('File Path from server:', newFilePath);
 
-        fs.writeFileSync(newFilePath, fileContent)
+            const newFilename = `upload_${uuidv4()}`;
+            newFilePath = path.join('/tmp', newFilename);
 
-        const command = `python3 ${pythonScriptPath} "${newFilePath}"`;
-        console.log('Command to run:', command);
+            console.log('File Path from server:', newFilePath);
 
-        const result = execSync(command, { encoding: 'utf-8' });
+            await fs.promises.writeFile(newFilePath, fileContent);
+            source = { filePath: newFilePath };
+        }
 
-        // Log the result from the Python script before sending the response
-        console.log("Python script output:", result);
+        // ?world=<guid> lets repeat uploads of one world re-decode only the characters that changed
+        const worldId = typeof req.query.world === 'string' ? req.query.world : undefined;
+        const job = parserPool.submit(source, layout, format, worldId);
+        jobs.add(job);
+        const tempFilePath = newFilePath;
+        newFilePath = null;
+        job.done.catch(() => {}).finally(() => {
+            if (tempFilePath) {
+                // Delete the temp file once the worker is done with it
+                fs.unlink(tempFilePath, (err) => {
+                    if (err) {
+                      console.error('Error deleting temp file:', err);
+                    } else {
+                      console.log('Temp file deleted successfully');
+                    }
+                  });
+            }
+        });
 
-        res.send(result);
+        if (source.spooling) {
+            pipeline(req, fs.createWriteStream(tempFilePath), (err) => {
+                if (err) {
+                    // The temp file is removed when the job settles
+                    parserPool.cancel(job, new Error('Upload aborted before parsing started'));
+                    return;
+                }
+                job.spooling = false;
+                parserPool.dispatch();
+            });
+        }
 
-        // Delete the temp file
-        fs.unlink(newFilePath, (err) => {
-            if (err) {
-              console.error('Error deleting temp file:', err);
-            } else {
-              console.log('Temp file deleted successfully');
-            }
-          });
+        res.status(202).location(`/jobs/${job.id}`).json({
+            jobId: job.id,
+            state: job.state,
+            statusUrl: `/jobs/${job.id}`,
+            resultUrl: `/jobs/${job.id}/result`,
+        });
     }
    catch (error) {
         console.log('Error has been caught');
@@ -67,10 +514,90 @@ app.post('/parse-save', (req, res) => {
         console.error('An unexpected error occurred in /parse-save handler:');
         console.error('Error:', error);
          console.error('Error stack:', error.stack);
+        if (newFilePath) {
+            fs.unlink(newFilePath, () => {});
+        }
     }
     console.log(`Request is now completed`)
     console.log('------------------------------------------------\n');
 });
+
+app.get('/jobs/:id', (req, res) => {
+    const job = jobs.get(req.params.id);
+    if (!job) {
+        res.status(404).json({ error: 'Unknown job' });
+        return;
+    }
+    const status = { jobId: job.id, state: job.state, progress: job.progress };
+    if (job.state === 'queued') {
+        status.queuePosition = parserPool.queuePosition(job);
+    } else if (job.state === 'done' && job.result.payload) {
+        status.resultUrl = `/jobs/${job.id}/result`;
+    } else if (job.state === 'failed') {
+        status.error = job.error;
+    }
+    res.json(status);
+});
+
+app.get('/jobs/:id/result', (req, res) => {
+    const job = jobs.get(req.params.id);
+    if (!job) {
+        res.status(404).json({ error: 'Unknown job' });
+        return;
+    }
+    if (job.state === 'failed') {
+        res.status(500).send('Error has occurred');
+        return;
+    }
+    if (job.state !== 'done') {
+        res.status(409).json({ jobId: job.id, state: job.state });
+        return;
+    }
+    if (!job.result.payload) {
+        res.status(410).json({ error: 'Result was already retrieved' });
+        return;
+    }
+    // The worker already encoded { guilds, playerData }; relay the bytes untouched
+    const serverTiming = serverTimingHeader(job.result.trace);
+    if (serverTiming) {
+        res.set('Server-Timing', serverTiming);
+    }
+    res.type(responseContentTypes[job.result.format]).send(job.result.payload);
+    jobs.releaseResult(job);
+});
+app.post('/breeding-paths', async (req, res) => {
+    const { pals, target, passives, maxGenerations, timeBudgetMs, limit } = req.body || {};
+    if (!Array.isArray(pals) || typeof target !== 'string') {
+        res.status(400).json({ error: 'Expected { pals: [...], target: "<species>" }' });
+        return;
+    }
+    if (parserPool.full) {
+        res.set('Retry-After', '5').status(503).send('Parser queue is full, try again shortly');
+        return;
+    }
+    const search = {
+        pals,
+        target,
+        passives: Array.isArray(passives) ? passives : [],
+        max_generations: Math.min(parseInt(maxGenerations, 10) || 5, breedingMaxGenerations),
+        time_budget_ms: Math.min(Number(timeBudgetMs) || 250, breedingMaxTimeBudgetMs),
+        limit: parseInt(limit, 10) || 5,
+    };
+    // Searches are short, so the answer comes back on this request rather than as a job
+    const job = parserPool.submit({ search }, 'objects', 'json');
+    try {
+        const result = await job.done;
+        const serverTiming = serverTimingHeader(result.trace);
+        if (serverTiming) {
+            res.set('Server-Timing', serverTiming);
+        }
+        res.type(responseContentTypes.json).send(result.payload);
+    } catch (error) {
+        console.error('Breeding path search failed:', error.message);
+        res.status(500).json({ error: error.message });
+    }
+});
+
 app.listen(port, () => {
     console.log(`Server listening on port ${port}`);
 });
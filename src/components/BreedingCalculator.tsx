@@ -6,6 +6,7 @@ import { BreedingSelector } from "./breeding/BreedingSelector";
 import { BreedingCalculationStatus } from "./breeding/BreedingCalculationStatus";
 import { BreedingResults } from "./breeding/BreedingResults";
 import { calculateBreedingPaths } from "@/utils/breedingCalculator";
+import { BreedingSearchOutcome, fetchBreedingPaths } from "@/utils/breedingSearchClient";
 
 interface BreedingCalculatorProps {
   guild: GuildData;
@@ -15,6 +16,9 @@ export function BreedingCalculator({ guild }: BreedingCalculatorProps) {
   const [availablePalTypes, setAvailablePalTypes] = useState<string[]>([]);
   const [availablePassives, setAvailablePassives] = useState<Passive[]>([]);
   const [calculatedPaths, setCalculatedPaths] = useState<BreedingPath[]>([]);
+  const [hasCalculated, setHasCalculated] = useState(false);
+  const [searchComplete, setSearchComplete] = useState(true);
+  const [missingPassives, setMissingPassives] = useState<Passive[]>([]);
   const [isCalculating, setIsCalculating] = useState(false);
   const [activeTab, setActiveTab] = useState("select");
   
@@ -43,6 +47,7 @@ export function BreedingCalculator({ guild }: BreedingCalculatorProps) {
   // Clear selection when guild changes
   useEffect(() => {
     setCalculatedPaths([]);
+    setHasCalculated(false);
     setActiveTab("select");
   }, [guild]);
 
@@ -50,19 +55,29 @@ export function BreedingCalculator({ guild }: BreedingCalculatorProps) {
     setIsCalculating(true);
     setActiveTab("calculate");
     
-    // Use timeout to simulate calculation time and avoid UI freezing
-    setTimeout(() => {
-      // Call the actual breeding calculator with guild data
-      const paths = calculateBreedingPaths(
-        guild,
-        desiredPalType,
-        selectedPassives,
-        prioritizeSpeed
-      );
-      
-      setCalculatedPaths(paths);
-      setIsCalculating(false);
-    }, 1500);
+    const calculateLocally = () =>
+      calculateBreedingPaths(guild, desiredPalType, selectedPassives, prioritizeSpeed);
+
+    // The server searches every generation; the local two-step calculator covers it being unreachable
+    fetchBreedingPaths(guild, desiredPalType, selectedPassives)
+      .then((outcome) => {
+        // An empty result the server can't explain with missing passives gets a second try locally
+        if (outcome.paths.length === 0 && outcome.missingPassives.length === 0) {
+          return { ...outcome, paths: calculateLocally() };
+        }
+        return outcome;
+      })
+      .catch((error): BreedingSearchOutcome => {
+        console.warn("Server breeding search failed, using the local calculator:", error);
+        return { paths: calculateLocally(), complete: true, missingPassives: [] };
+      })
+      .then((outcome) => {
+        setCalculatedPaths(outcome.paths);
+        setSearchComplete(outcome.complete);
+        setMissingPassives(outcome.missingPassives);
+        setHasCalculated(true);
+        setIsCalculating(false);
+      });
   };
 
   const handleViewResults = () => {
@@ -101,7 +116,10 @@ export function BreedingCalculator({ guild }: BreedingCalculatorProps) {
         <TabsContent value="calculate">
           <BreedingCalculationStatus 
             isCalculating={isCalculating}
+            hasCalculated={hasCalculated}
             pathsFound={calculatedPaths.length}
+            searchComplete={searchComplete}
+            missingPassives={missingPassives}
             onViewResults={handleViewResults}
           />
         </TabsContent>
@@ -1,9 +1,81 @@
-import { useState, useCallback } from "react";
+import { useState, useCallback, useEffect, useRef } from "react";
 import { Button } from "@/components/ui/button";
 import { ArrowRight, Upload } from "lucide-react";
 import { useToast } from "@/hooks/use-toast";
 import { SaveFileData } from "@/types/pal";
 import { Alert, AlertTitle, AlertDescription } from "@/components/ui/alert";
+import { ColumnarRoster, decodeColumnarRoster } from "@/utils/columnarRoster";
+import { PARSER_URL } from "@/utils/parserUrl";
+
+// Guild rosters as returned by /parse-save?layout=columnar
+interface ParsedSaveResponse {
+  guilds: ColumnarRoster;
+  playerData: Record<string, { name: string; guild_id: string }>;
+}
+
+const JOB_POLL_INTERVAL_MS = 500;
+// Overall limit on waiting for a parse job, queued or running
+const JOB_POLL_TIMEOUT_MS = 10 * 60 * 1000;
+
+// /parse-save answers with a job; /jobs/:id reports the parser's milestones
+interface ParseJobStatus {
+  jobId: string;
+  state: "queued" | "running" | "done" | "failed";
+  progress: { stage: string; done: number | null; total: number | null } | null;
+  queuePosition?: number;
+  resultUrl?: string;
+  error?: string;
+}
+
+const describeJob = (job: ParseJobStatus): string => {
+  if (job.state === "queued") {
+    return `Waiting for a parser (${(job.queuePosition ?? 0) + 1} in queue)...`;
+  }
+  const progress = job.progress;
+  if (!progress) {
+    return "Analyzing save file structure...";
+  }
+  switch (progress.stage) {
+    case "decompressed":
+      return "Reading world data...";
+    case "characters_parsed":
+      return `Parsing characters (${progress.done} / ${progress.total})...`;
+    case "guilds_indexed":
+      return "Processing guild data...";
+    default:
+      return "Analyzing save file structure...";
+  }
+};
+
+class ParseJobTimeoutError extends Error {}
+
+const describeTimeout = (job: ParseJobStatus): string => {
+  const minutes = Math.round(JOB_POLL_TIMEOUT_MS / 60000);
+  if (job.state === "queued") {
+    return `The parser is still busy with other saves (still queued after ${minutes} minutes). Please try again shortly.`;
+  }
+  return `The save is still being parsed after ${minutes} minutes. Please try again later.`;
+};
+
+// Resolves after `ms`, or rejects as soon as `signal` aborts
+const pollDelay = (ms: number, signal: AbortSignal): Promise<void> =>
+  new Promise((resolve, reject) => {
+    const timer = setTimeout(resolve, ms);
+    signal.addEventListener("abort", () => {
+      clearTimeout(timer);
+      reject(signal.reason);
+    }, { once: true });
+  });
+
+const readError = async (response: Response, fallback: string): Promise<string> => {
+  const errorText = await response.text();
+  try {
+    const errorData = JSON.parse(errorText);
+    return errorData.message || errorData.error || fallback;
+  } catch {
+    return errorText || fallback;
+  }
+};
 
 interface FileUploaderProps {
   onUploadComplete: (data: SaveFileData) => void;
@@ -17,6 +89,10 @@ export function FileUploader({ onUploadComplete }: FileUploaderProps) {
   const [isUploading, setIsUploading] = useState(false);
   const [parseError, setParseError] = useState<string | null>(null);
   const [parseStatus, setParseStatus] = useState<string | null>(null);
+  const parseAbortRef = useRef<AbortController | null>(null);
+
+  // Stop polling a parse job once the uploader is gone
+  useEffect(() => () => parseAbortRef.current?.abort(), []);
 
   // Handle drag events
   const handleDragOver = useCallback((e: React.DragEvent<HTMLDivElement>) => {
@@ -71,6 +147,10 @@ export function FileUploader({ onUploadComplete }: FileUploaderProps) {
 
   // Process the file by sending it to the server
   const processFile = async () => {
+    parseAbortRef.current?.abort();
+    const controller = new AbortController();
+    parseAbortRef.current = controller;
+    const { signal } = controller;
     setIsUploading(true);
     setParseError(null);
     setParseStatus("Analyzing save file structure...");
@@ -79,26 +159,43 @@ export function FileUploader({ onUploadComplete }: FileUploaderProps) {
       if (!file) {
         throw new Error("No file selected");
       }
-      const formData = new FormData();
-      formData.append("file", file);
-
-      const response = await fetch("http://localhost:3001/parse-save", { // Update the fetch url here
+      // Send the raw bytes; the server streams them straight into the parser
+      const response = await fetch(`${PARSER_URL}/parse-save?layout=columnar`, { // Update the fetch url here
         method: "POST",
-        body: formData,
+        headers: { "Content-Type": "application/octet-stream" },
+        body: file,
+        signal,
       });
 
       if (!response.ok) {
-        try {
-          const errorData = await response.json();
-          throw new Error(errorData.message || "Failed to parse file");
-        } catch (jsonError) {
-          const errorText = await response.text();
-          throw new Error(errorText || "Failed to parse file");
+        throw new Error(await readError(response, "Failed to parse file"));
+      }
+
+      let job: ParseJobStatus = await response.json();
+      const statusUrl = `${PARSER_URL}/jobs/${job.jobId}`;
+      const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+      while (job.state !== "done") {
+        if (Date.now() >= deadline) {
+          throw new ParseJobTimeoutError(describeTimeout(job));
+        }
+        await pollDelay(JOB_POLL_INTERVAL_MS, signal);
+        const statusResponse = await fetch(statusUrl, { signal });
+        if (!statusResponse.ok) {
+          throw new Error(await readError(statusResponse, "Lost track of the parse job"));
         }
+        job = await statusResponse.json();
+        if (job.state === "failed") {
+          throw new Error(job.error || "Failed to parse file");
+        }
+        setParseStatus(describeJob(job));
       }
 
-      const parsedResult = await response.json();
-      const saveData = { guilds: parsedResult, isMockData: false };
+      const resultResponse = await fetch(`${statusUrl}/result`, { signal });
+      if (!resultResponse.ok) {
+        throw new Error(await readError(resultResponse, "Failed to parse file"));
+      }
+      const parsedResult: ParsedSaveResponse = await resultResponse.json();
+      const saveData = { guilds: decodeColumnarRoster(parsedResult.guilds), isMockData: false };
       
       setParseStatus("Processing guild data...");
       
@@ -121,6 +218,9 @@ export function FileUploader({ onUploadComplete }: FileUploaderProps) {
 
       setParseStatus(null);
     } catch (error) {
+      if (signal.aborted) {
+        return;
+      }
       console.error("Error processing file:", error);
       setUploadError(error instanceof Error ? error.message : "Failed to parse save file");
       setParseStatus(null);
@@ -128,10 +228,14 @@ export function FileUploader({ onUploadComplete }: FileUploaderProps) {
       toast({
         variant: "destructive",
         title: "Save file processing error",
-        description: "Unable to parse the save file. Please ensure you're uploading a valid Palworld Level.sav file.",
+        description: error instanceof ParseJobTimeoutError
+          ? error.message
+          : "Unable to parse the save file. Please ensure you're uploading a valid Palworld Level.sav file.",
       });
     } finally {
-      setIsUploading(false);
+      if (!signal.aborted) {
+        setIsUploading(false);
+      }
     }
   };
 
@@ -166,7 +270,7 @@ export function FileUploader({ onUploadComplete }: FileUploaderProps) {
 
           <AlertTitle className="text-red-200">Upload error</AlertTitle>
           <AlertDescription className="text-amber-100/70">
-            {parseError}
+            {uploadError}
           </AlertDescription>
         </Alert>
       )}
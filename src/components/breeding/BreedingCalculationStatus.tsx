@@ -1,18 +1,31 @@
 
 import { Button } from "@/components/ui/button";
 import { ArrowRight } from "lucide-react";
+import { Passive } from "@/types/pal";
 
 interface BreedingCalculationStatusProps {
   isCalculating: boolean;
+  hasCalculated: boolean;
   pathsFound: number;
+  searchComplete: boolean;
+  missingPassives: Passive[];
   onViewResults: () => void;
 }
 
 export function BreedingCalculationStatus({ 
   isCalculating, 
+  hasCalculated,
   pathsFound,
+  searchComplete,
+  missingPassives,
   onViewResults
 }: BreedingCalculationStatusProps) {
+  const incompleteNote = !searchComplete && (
+    <p className="text-sm text-yellow-500 mb-6">
+      The search ran out of time before checking every route, so some may be missing.
+    </p>
+  );
+
   if (isCalculating) {
     return (
       <div className="text-center py-12">
@@ -36,6 +49,7 @@ export function BreedingCalculationStatus({
         <p className="text-muted-foreground mb-6">
           {pathsFound} possible breeding routes found
         </p>
+        {incompleteNote}
         <Button 
           className="bg-palaccent hover:bg-palaccent-light"
           onClick={onViewResults}
@@ -46,6 +60,25 @@ export function BreedingCalculationStatus({
     );
   }
 
+  if (hasCalculated) {
+    return (
+      <div className="text-center p-6">
+        <h3 className="text-xl font-semibold text-white mb-2">No Breeding Routes Found</h3>
+        {missingPassives.length > 0 ? (
+          <p className="text-muted-foreground mb-6">
+            No pal in this guild has {missingPassives.map((passive) => passive.name).join(", ")}, so no route can pass it on.
+          </p>
+        ) : (
+          incompleteNote || (
+            <p className="text-muted-foreground mb-6">
+              None of this guild's pals can be bred into the selected pal with those passives.
+            </p>
+          )
+        )}
+      </div>
+    );
+  }
+
   return (
     <div className="text-center py-12">
       <p className="text-muted-foreground">Ready to calculate breeding routes</p>
@@ -0,0 +1,123 @@
+/**
+ * Client for the server-side breeding path search (POST /breeding-paths)
+ */
+
+import { BreedingPath, GuildData, Pal, Passive } from "@/types/pal";
+import { PARSER_URL } from "./parserUrl";
+
+type SearchParent = { pal: string } | { step: number };
+
+interface SearchStep {
+  parents: [SearchParent, SearchParent];
+  species: string;
+  passives: string[];
+  generation: number;
+  probability: number;
+}
+
+interface SearchPath {
+  steps: SearchStep[];
+  generations: number;
+  breedings: number;
+  probability: number;
+  eggs: number;
+  pal?: string;
+}
+
+export interface BreedingSearchResult {
+  target: string;
+  passives: string[];
+  paths: SearchPath[];
+  complete: boolean;
+  settled: number;
+  elapsed_ms: number;
+  missing_passives?: string[];
+}
+
+export interface BreedingSearchOutcome {
+  paths: BreedingPath[];
+  /** False when the search ran out of time before exploring every route */
+  complete: boolean;
+  /** Desired passives no pal in the guild carries, so no route can reach them */
+  missingPassives: Passive[];
+}
+
+export interface BreedingSearchOptions {
+  maxGenerations?: number;
+  timeBudgetMs?: number;
+  limit?: number;
+}
+
+/**
+ * Asks the server for the shortest breeding paths from the guild's pals to
+ * `targetPalType` carrying `desiredPassives`, and expands them into the
+ * BreedingPath shape the results view renders. Bred pals are synthesized;
+ * roster pals are the guild's own objects. The outcome also says whether
+ * the search finished and which desired passives no pal carries.
+ */
+export async function fetchBreedingPaths(
+  guild: GuildData,
+  targetPalType: string,
+  desiredPassives: Passive[],
+  options: BreedingSearchOptions = {}
+): Promise<BreedingSearchOutcome> {
+  const palsById = new Map<string, Pal>();
+  const passivesById = new Map<string, Passive>();
+  guild.members.forEach((member) => {
+    member.pals.forEach((pal) => {
+      palsById.set(pal.id, pal);
+      pal.passives.forEach((passive) => passivesById.set(passive.id, passive));
+    });
+  });
+  desiredPassives.forEach((passive) => passivesById.set(passive.id, passive));
+
+  const response = await fetch(`${PARSER_URL}/breeding-paths`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      pals: Array.from(palsById.values(), (pal) => ({
+        id: pal.id,
+        name: pal.name,
+        passives: pal.passives.map((passive) => passive.id),
+      })),
+      target: targetPalType,
+      passives: desiredPassives.map((passive) => passive.id),
+      ...options,
+    }),
+  });
+  if (!response.ok) {
+    throw new Error(`Breeding path search failed (${response.status})`);
+  }
+  const result: BreedingSearchResult = await response.json();
+
+  const paths = result.paths.map((path, pathIndex): BreedingPath => {
+    const bred: Pal[] = path.steps.map((step, stepIndex) => ({
+      id: `bred-${pathIndex}-${stepIndex}`,
+      name: step.species,
+      level: 1,
+      passives: step.passives.map((id) => passivesById.get(id)!),
+      owner: "",
+      guildMember: `Generation ${step.generation}`,
+    }));
+    const resolve = (parent: SearchParent): Pal =>
+      "pal" in parent ? palsById.get(parent.pal)! : bred[parent.step];
+
+    return {
+      steps: path.steps.map((step, stepIndex) => ({
+        mother: resolve(step.parents[0]),
+        father: resolve(step.parents[1]),
+        possibleOffspring: [bred[stepIndex]],
+        probabilityForDesired: step.probability,
+      })),
+      finalPal: path.pal !== undefined ? palsById.get(path.pal)! : bred[bred.length - 1],
+      totalEggsRequired: path.eggs,
+      probabilityOfSuccess: path.probability,
+    };
+  });
+
+  return {
+    paths,
+    complete: result.complete,
+    missingPassives: (result.missing_passives ?? []).map((id) => passivesById.get(id)!),
+  };
+}
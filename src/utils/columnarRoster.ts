@@ -0,0 +1,62 @@
+/**
+ * Decoder for the columnar guild roster returned by /parse-save?layout=columnar
+ */
+
+import { GuildData, Pal, Passive } from "@/types/pal";
+
+export interface ColumnarRoster {
+  layout: "columnar";
+  species: string[];
+  passives: string[];
+  owners: string[];
+  ownerNames: string[];
+  guilds: { id: string; guildName: string; members: number[] }[];
+  pals: {
+    id: string[];
+    level: number[];
+    species: number[];
+    owner: number[];
+    passiveOffsets: number[];
+    passiveIds: number[];
+  };
+}
+
+/**
+ * Expands a columnar roster into the GuildData shape used by the UI.
+ * Each passive is materialized once and shared by every pal that has it.
+ */
+export function decodeColumnarRoster(roster: ColumnarRoster): GuildData[] {
+  const passives: Passive[] = roster.passives.map((name) => ({
+    id: name,
+    name,
+    description: "",
+    rarity: "common",
+  }));
+
+  const palsByOwner: Pal[][] = roster.owners.map(() => []);
+  const { id, level, species, owner, passiveOffsets, passiveIds } = roster.pals;
+  for (let i = 0; i < id.length; i++) {
+    const ownerId = owner[i];
+    const palPassives: Passive[] = [];
+    for (let j = passiveOffsets[i]; j < passiveOffsets[i + 1]; j++) {
+      palPassives.push(passives[passiveIds[j]]);
+    }
+    palsByOwner[ownerId].push({
+      id: id[i],
+      name: roster.species[species[i]],
+      level: level[i],
+      passives: palPassives,
+      owner: roster.owners[ownerId],
+      guildMember: roster.ownerNames[ownerId],
+    });
+  }
+
+  return roster.guilds.map((guild) => ({
+    guildName: guild.guildName,
+    members: guild.members.map((ownerId) => ({
+      id: roster.owners[ownerId],
+      name: roster.ownerNames[ownerId],
+      pals: palsByOwner[ownerId],
+    })),
+  }));
+}
@@ -0,0 +1,5 @@
+/**
+ * Base URL of the local save parser server (server.js)
+ */
+
+export const PARSER_URL = "http://localhost:3001";